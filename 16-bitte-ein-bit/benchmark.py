@@ -0,0 +1,47 @@
+#!/bin/env python3
+#
+# This script compares the speed of the BITS decoders on a randomly
+# generated transmission (see bits_generator.py). The memory-mapped file
+# reader is benchmarked on the same transmission, written to a file.
+#
+# Usage: benchmark.py [<size in MB>] [<seed>]
+
+import os
+import sys
+from sys import argv
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from bits import *
+from bits_generator import generate_transmission
+
+
+def benchmark(name, decode_func, hexstring):
+    started = perf_counter()
+    ast = decode_func(hexstring)
+    elapsed = perf_counter() - started
+    size = len(hexstring) / 2 / 1024 / 1024
+    print(f"{name:20s} {elapsed:8.3f}s  {size / elapsed:8.2f} MB/s")
+    return elapsed, ast
+
+
+def decode_bitstream(hexstring):
+    return parse_bitstream(hexstream_to_bitstream(iter(hexstring)))
+
+
+size = float(argv[1]) if len(argv) > 1 else 2
+seed = int(argv[2]) if len(argv) > 2 else 2021
+
+hexstring = generate_transmission(int(size * 1024 * 1024), seed=seed)
+print(f"Decoding a transmission of {len(hexstring) // 2} bytes")
+
+baseline, expected = benchmark("generator pipeline", decode_bitstream, hexstring)
+bytewise, ast = benchmark("BitReader", decode_hex, hexstring)
+with TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "transmission.txt")
+    with open(path, "w") as f:
+        f.write(hexstring + "\n")
+    _, mapped_ast = benchmark("HexFileReader", lambda _: decode_file(path), hexstring)
+if ast != expected or mapped_ast != expected:
+    print("The decoders do not agree on the decoded packets!")
+    sys.exit(1)
+print(f"BitReader speedup: {baseline / bytewise:.2f}x")
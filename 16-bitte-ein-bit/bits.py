@@ -0,0 +1,555 @@
+#!/bin/env python3
+#
+# A decoder for BITS transmissions that works on the bytes of a transmission,
+# instead of on a stream of individual bits.
+#
+# A BitReader keeps a bit cursor into the transmission, which is stored as
+# an array of 64 bit words. Reading a field of multiple bits takes the words
+# that the field overlaps with, after which the field is cut out of those
+# using a shift and a mask. The decoded packets use the same
+# (version, packet type, args) format as the original parser.
+#
+# The original per-bit generator pipeline is kept at the bottom of this file.
+# It is used as the reference for benchmarking and cross-checking.
+
+import gc
+import mmap
+import os
+from array import array
+from binascii import Error as BinasciiError, unhexlify
+from contextlib import contextmanager
+from math import prod
+from sys import byteorder
+
+TYPE_SUM = 0
+TYPE_PRODUCT = 1
+TYPE_MIN = 2
+TYPE_MAX = 3
+TYPE_LITERAL = 4
+TYPE_GT = 5
+TYPE_LT = 6
+TYPE_EQ = 7
+COMPARISON_TYPES = (TYPE_GT, TYPE_LT, TYPE_EQ)
+
+# The smallest packet is a literal with a single group of bits.
+MIN_PACKET_BITLEN = 6 + 5
+
+# Every packet contains a one bit within its first 22 bits: in the type of
+# a literal packet, or in the length type, sub-packet count or sub-packet
+# length of an operator packet (operator packets without sub-packets are
+# rejected). 22 zero bits therefore can not be the start of a packet.
+MAX_HEADER_BITLEN = 22
+
+
+class BitsException(Exception):
+    pass
+
+
+class BitReader:
+    """Reads fields of up to 64 bits from a bytes buffer, starting at the most
+    significant bit of the first byte. The buffer is converted into an array
+    of 64 bit words in one go, so fields can be cut out of at most two words
+    using a shift and a mask. The words are padded with zero words, so a
+    window of two words can always be taken.
+
+    Bit positions are counted from the start of the transmission. The words
+    start at bit position base, and a window can be taken at any position
+    below limit. Readers that do not hold the full transmission in memory
+    move the words forward by implementing refill()."""
+
+    def __init__(self, data):
+        self.bitlen = len(data) * 8
+        self.words = bytes_to_words(bytes(data) + bytes(-len(data) % 8 + 16))
+        self.base = 0
+        self.limit = self.bitlen
+        self.pos = 0
+
+    def refill(self, pos):
+        """Makes sure that a window can be taken at bit position pos."""
+        raise_end_of_transmission(self.bitlen)
+
+    def has_bits(self, pos):
+        """Returns True when the transmission contains a bit at position pos."""
+        return pos < self.bitlen
+
+    def read(self, bitlen):
+        start = self.pos
+        end = start + bitlen
+        if start >= self.limit:
+            self.refill(start)
+        if end > self.bitlen:
+            raise_end_of_transmission(self.bitlen)
+        index = (start - self.base) >> 6
+        window = self.words[index] << 64 | self.words[index + 1]
+        self.pos = end
+        return (window >> (128 - (start & 63) - bitlen)) & ((1 << bitlen) - 1)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HexFileReader(BitReader):
+    """Reads fields of bits from a file that contains a hexadecimal transmission.
+    The file is memory-mapped, and decoded in chunks of chunk_size hex digits,
+    only when the cursor gets near the end of the words that are in memory.
+    Memory use therefore does not depend on the size of the file.
+    Whitespace (like line endings) is ignored."""
+
+    def __init__(self, path, chunk_size=1 << 20):
+        self.chunk_size = max(chunk_size, 64)
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.offset = 0
+        self.pending_hex = b""
+        self.pending_bytes = b""
+        self.decoded = 0
+        self.bitlen = UNKNOWN_BITLEN
+        self.words = array("Q")
+        self.base = 0
+        self.limit = 0
+        self.pos = 0
+
+    def refill(self, pos):
+        keep = (pos - self.base) >> 6
+        self.words = self.words[keep:]
+        self.base += keep << 6
+        while pos >= self.limit:
+            if self.bitlen != UNKNOWN_BITLEN:
+                raise_end_of_transmission(self.bitlen)
+            self.load_chunk()
+
+    def has_bits(self, pos):
+        while pos >= self.limit and self.bitlen == UNKNOWN_BITLEN:
+            self.load_chunk()
+        return pos < self.bitlen
+
+    def load_chunk(self):
+        chunk = self.mmap[self.offset:self.offset + self.chunk_size]
+        self.offset += len(chunk)
+        hexdigits = self.pending_hex + chunk.translate(None, WHITESPACE)
+        split = len(hexdigits) & ~1
+        self.pending_hex = hexdigits[split:]
+        try:
+            data = self.pending_bytes + unhexlify(hexdigits[:split])
+        except BinasciiError as e:
+            raise BitsException(f"Invalid hexadecimal transmission: {e}") from None
+        self.decoded += split // 2
+
+        if self.offset < len(self.mmap):
+            split = len(data) & ~7
+            self.pending_bytes = data[split:]
+            self.words.extend(bytes_to_words(data[:split]))
+            self.limit = self.base + max(0, len(self.words) - 2) * 64
+        else:
+            if self.pending_hex:
+                # An odd number of hex digits: pad with a zero digit, which
+                # does not add any packet bits.
+                data += unhexlify(self.pending_hex + b"0")
+                self.decoded += 1
+            self.pending_bytes = b""
+            self.words.extend(bytes_to_words(data + bytes(-len(data) % 8 + 16)))
+            self.bitlen = self.decoded * 8
+            self.limit = self.bitlen
+
+    def close(self):
+        if self.mmap:
+            self.mmap.close()
+        self.file.close()
+
+
+# Until the last chunk of a HexFileReader is loaded, the length of the
+# transmission is not known. This value is larger than any bit position.
+UNKNOWN_BITLEN = 1 << 62
+WHITESPACE = b" \t\r\n"
+
+
+def bytes_to_words(data):
+    """Converts bytes (a multiple of 8) into an array of big-endian 64 bit words."""
+    words = array("Q", data)
+    if byteorder == "little":
+        words.byteswap()
+    return words
+
+
+def raise_end_of_transmission(bitlen):
+    raise BitsException(f"Unexpected end of transmission at bit {bitlen}")
+
+
+def raise_operator_without_sub_packets(packet_type, pos):
+    raise BitsException(
+        f"Operator packet (type {packet_type}) without sub-packets at bit {pos}")
+
+
+def hex_to_reader(hexstring):
+    """Returns a BitReader for a hexadecimal transmission. Whitespace (like
+    the trailing newline of an input file) is ignored. An odd number of hex
+    digits is padded with a zero digit, which does not add any packet bits."""
+    hexstring = "".join(hexstring.split())
+    if len(hexstring) % 2:
+        hexstring += "0"
+    try:
+        return BitReader(bytes.fromhex(hexstring))
+    except ValueError as e:
+        raise BitsException(f"Invalid hexadecimal transmission: {e}") from None
+
+
+def file_to_reader(path, chunk_size=1 << 20):
+    return HexFileReader(path, chunk_size)
+
+
+def decode(reader):
+    """Decodes the packet at the cursor of the BitReader."""
+    with paused_gc():
+        return parse_packet(reader)
+
+
+@contextmanager
+def paused_gc():
+    """Pauses garbage collection while building large packet trees or
+    instruction lists. Those do not contain reference cycles, and for large
+    transmissions the collector would otherwise keep scanning them."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def decode_hex(hexstring):
+    return decode(hex_to_reader(hexstring))
+
+
+def decode_file(path):
+    with file_to_reader(path) as reader:
+        return decode(reader)
+
+
+def iter_packets(source, align=8):
+    """Yields the top-level packets of a transmission that consists of any
+    number of concatenated packets, each one as soon as it is decoded. The
+    source is either a BitReader, or the path of a file that contains a
+    hexadecimal transmission (which is read using a HexFileReader).
+
+    Every packet is padded with zero bits up to the next multiple of align
+    bits. The default is a byte boundary, like for a single-packet transmission.
+    Trailing zero bits after the last packet (like extra zero bytes) are ignored."""
+    if isinstance(source, BitReader):
+        yield from _iter_packets(source, align)
+    else:
+        with file_to_reader(source) as reader:
+            yield from _iter_packets(reader, align)
+
+
+def _iter_packets(reader, align):
+    while reader.has_bits(reader.pos + MIN_PACKET_BITLEN - 1):
+        start = reader.pos
+        if not reader.read(read_ahead_bitlen(reader, MAX_HEADER_BITLEN)):
+            break
+        reader.pos = start
+        yield decode(reader)
+        padding = -reader.pos % align
+        if padding and reader.has_bits(reader.pos) and reader.read(padding):
+            raise BitsException(f"Non-zero padding bits before bit {reader.pos}")
+    while reader.has_bits(reader.pos):
+        bits = reader.read(read_ahead_bitlen(reader, 64))
+        if bits:
+            raise BitsException(
+                f"Unexpected trailing bits at bit {reader.pos - bits.bit_length()}")
+
+
+def read_ahead_bitlen(reader, bitlen):
+    """Returns bitlen, or the number of bits left when that is less."""
+    if reader.has_bits(reader.pos + bitlen - 1):
+        return bitlen
+    return reader.bitlen - reader.pos
+
+
+def iter_packet_results(source, align=8):
+    """Like iter_packets(), but yields a tuple of (version sum, value)
+    for every top-level packet."""
+    for ast in iter_packets(source, align):
+        yield sum_versions(ast), evaluate(ast)
+
+
+def sum_versions(ast):
+    total = 0
+    todo = [ast]
+    while todo:
+        version, packet_type, args = todo.pop()
+        total += version
+        if packet_type != TYPE_LITERAL:
+            todo.extend(args)
+    return total
+
+
+def parse_packet(reader):
+    ast, reader.pos = parse_packet_at(reader, reader.pos)
+    return ast
+
+
+def parse_packet_at(reader, pos):
+    """Decodes the packet that starts at bit position pos.
+    Returns a tuple of (packet, bit position after the packet).
+
+    A packet header, including the operator length field, is at most 22 bits.
+    Taking a window of two words from the word in which the packet starts,
+    leaves at least 65 bits to cut the header fields and up to 11 literal
+    groups from, without having to look up words for every field.
+
+    Sub-packets are decoded without recursion, so the nesting depth of the
+    packets is not limited by the recursion limit. Operator packets that
+    are still collecting sub-packets are kept on a stack of frames
+    [version, packet type, args, end position, remaining count], in which
+    either the end position (length type 0) or the remaining number of
+    sub-packets (length type 1) is used, while the other one is None."""
+    stack = []
+    while True:
+        if pos >= reader.limit:
+            reader.refill(pos)
+        index = (pos - reader.base) >> 6
+        window = reader.words[index] << 64 | reader.words[index + 1]
+        avail = 128 - (pos & 63)
+        header = (window >> (avail - 7)) & 0x7F
+        version = header >> 4
+        packet_type = (header >> 1) & 7
+
+        if packet_type == TYPE_LITERAL:
+            used = 6
+            value = 0
+            while True:
+                if used + 5 > avail:
+                    pos += used
+                    used = 0
+                    if pos >= reader.limit:
+                        reader.refill(pos)
+                    index = (pos - reader.base) >> 6
+                    window = reader.words[index] << 64 | reader.words[index + 1]
+                    avail = 128 - (pos & 63)
+                group = (window >> (avail - used - 5)) & 0x1F
+                used += 5
+                value = value << 4 | group & 0xF
+                if not group & 0x10:
+                    break
+            pos += used
+            if pos > reader.bitlen:
+                raise_end_of_transmission(reader.bitlen)
+            packet = (version, packet_type, value)
+        elif header & 1 == 0:
+            length = (window >> (avail - 22)) & 0x7FFF
+            if not length:
+                raise_operator_without_sub_packets(packet_type, pos)
+            end = pos + 22 + length
+            pos += 22
+            if end > reader.bitlen:
+                raise_end_of_transmission(reader.bitlen)
+            stack.append([version, packet_type, [], end, None])
+            continue
+        else:
+            count = (window >> (avail - 18)) & 0x7FF
+            if not count:
+                raise_operator_without_sub_packets(packet_type, pos)
+            pos += 18
+            if pos > reader.bitlen:
+                raise_end_of_transmission(reader.bitlen)
+            stack.append([version, packet_type, [], None, count])
+            continue
+
+        # The packet is complete. Add it to the operator packet that it is
+        # a sub-packet of, and complete that one as well when this was its
+        # last sub-packet.
+        while stack:
+            frame = stack[-1]
+            frame[2].append(packet)
+            end = frame[3]
+            if end is None:
+                frame[4] -= 1
+                if frame[4]:
+                    break
+            elif pos < end:
+                break
+            elif pos > end:
+                raise BitsException(
+                    f"Sub-packets overrun their length by {pos - end} bits")
+            stack.pop()
+            packet = (frame[0], frame[1], frame[2])
+        else:
+            return packet, pos
+
+
+class BitsExpression:
+    """Implements a compiled BITS expression. The packet tree is lowered into
+    a flat list of (opcode, operand) instructions in postfix order, which is
+    evaluated using an explicit stack. For literal packets, the operand is the
+    literal value. For operator packets, the operand is the number of values
+    that the operator takes from the stack. Since no recursion is involved,
+    the nesting depth of the packets is not limited by the recursion limit.
+    A compiled expression can be evaluated any number of times."""
+
+    def __init__(self, instructions):
+        self.instructions = instructions
+
+    def evaluate(self):
+        stack = []
+        push = stack.append
+        funcs = OPERATOR_FUNCS
+        for opcode, operand in self.instructions:
+            if opcode == TYPE_LITERAL:
+                push(operand)
+            else:
+                args = stack[-operand:]
+                del stack[-operand:]
+                push(funcs[opcode](args))
+        return stack[0]
+
+
+OPERATOR_FUNCS = {
+    TYPE_SUM: sum,
+    TYPE_PRODUCT: prod,
+    TYPE_MIN: min,
+    TYPE_MAX: max,
+    TYPE_GT: lambda args: int(args[0] > args[1]),
+    TYPE_LT: lambda args: int(args[0] < args[1]),
+    TYPE_EQ: lambda args: int(args[0] == args[1]),
+}
+
+
+def compile_packet(ast):
+    """Compiles a packet tree into a BitsExpression. The tree is walked
+    depth-first without recursion. Visiting a packet before its sub-packets,
+    and the sub-packets from right to left, produces the reversed postfix
+    order of the instructions."""
+    instructions = []
+    todo = [ast]
+    with paused_gc():
+        while todo:
+            _, packet_type, args = todo.pop()
+            if packet_type == TYPE_LITERAL:
+                instructions.append((TYPE_LITERAL, args))
+                continue
+            if packet_type not in OPERATOR_FUNCS:
+                raise BitsException(f"Unknown packet type {packet_type}")
+            if not args:
+                raise BitsException(
+                    f"Operator packet (type {packet_type}) without sub-packets")
+            if packet_type in COMPARISON_TYPES and len(args) != 2:
+                raise BitsException(
+                    f"Comparison packet (type {packet_type}) requires 2 sub-packets,"
+                    f" got {len(args)}")
+            instructions.append((packet_type, len(args)))
+            todo.extend(args)
+    instructions.reverse()
+    return BitsExpression(instructions)
+
+
+def evaluate(ast):
+    return compile_packet(ast).evaluate()
+
+
+# Reference implementation: the original per-bit generator pipeline.
+
+
+def file_to_hexstream(path):
+    with open(path, "r") as f:
+        for line in f:
+            yield from line.strip().upper()
+
+
+def hexstream_to_bitstream(hexstream):
+    HEXMAP = {
+        "0": (0, 0, 0, 0),
+        "1": (0, 0, 0, 1),
+        "2": (0, 0, 1, 0),
+        "3": (0, 0, 1, 1),
+        "4": (0, 1, 0, 0),
+        "5": (0, 1, 0, 1),
+        "6": (0, 1, 1, 0),
+        "7": (0, 1, 1, 1),
+        "8": (1, 0, 0, 0),
+        "9": (1, 0, 0, 1),
+        "A": (1, 0, 1, 0),
+        "B": (1, 0, 1, 1),
+        "C": (1, 1, 0, 0),
+        "D": (1, 1, 0, 1),
+        "E": (1, 1, 1, 0),
+        "F": (1, 1, 1, 1),
+    }
+    for hexchar in hexstream:
+        yield from HEXMAP[hexchar]
+
+
+def parse_bitstream(bits):
+    _, ast = parse_bitstream_packet(bits)
+    return ast
+
+
+def parse_bitstream_packet(bits):
+    version = parse_int_value(bits, 3)
+    packet_type = parse_int_value(bits, 3)
+    bitlen = 6
+    if packet_type == TYPE_LITERAL:
+        lit_bitlen, lit_value = parse_literal(bits)
+        return bitlen + lit_bitlen, (version, packet_type, lit_value)
+    else:
+        op_bitlen, op_value = parse_operator(bits)
+        return bitlen + op_bitlen, (version, packet_type, op_value)
+
+
+def parse_int_value(bits, bitlen):
+    value = 0
+    for _ in range(bitlen):
+        value = value << 1 | next(bits)
+    return value
+
+
+def parse_literal(bits):
+    bitlen = 0
+    value = 0
+    while True:
+        there_is_more = next(bits)
+        value = value << 4 | parse_int_value(bits, 4)
+        bitlen += 5
+        if not there_is_more:
+            return bitlen, value
+
+
+def parse_operator(bits):
+    bitlen = 1
+    length_type = next(bits)
+    if length_type == 0:
+        op_bitlen, op_value = parse_operator_args_by_bitlen(bits)
+    elif length_type == 1:
+        op_bitlen, op_value = parse_operator_args_by_nr_of_args(bits)
+    return bitlen + op_bitlen, op_value
+
+
+def parse_operator_args_by_bitlen(bits):
+    bitlen = 15
+    expected_bits = parse_int_value(bits, bitlen)
+    args = []
+    while expected_bits > 0:
+        packet_bitlen, packet_value = parse_bitstream_packet(bits)
+        bitlen += packet_bitlen
+        args.append(packet_value)
+        expected_bits -= packet_bitlen
+    return bitlen, args
+
+
+def parse_operator_args_by_nr_of_args(bits):
+    bitlen = 11
+    expected_args = parse_int_value(bits, bitlen)
+    args = []
+    while expected_args > 0:
+        packet_bitlen, packet_value = parse_bitstream_packet(bits)
+        bitlen += packet_bitlen
+        args.append(packet_value)
+        expected_args -= 1
+    return bitlen, args
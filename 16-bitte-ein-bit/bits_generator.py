@@ -0,0 +1,120 @@
+#!/bin/env python3
+#
+# This script generates random BITS transmissions, that can be used as input
+# for testing and benchmarking the BITS decoders.
+#
+# Usage: bits_generator.py <size in bytes> [<max depth>] [<seed>]
+#        bits_generator.py --capture <number of packets> [<max depth>] [<seed>]
+#
+# The generated transmission is a single sum packet, wrapping random packets
+# until the requested size is reached. When there are more sub-packets than
+# fit in one operator packet, they are grouped into nested sum packets.
+#
+# With --capture, a capture of concatenated top-level packets is generated,
+# as can be processed using iter_packets() from bits.py.
+
+from random import Random
+from sys import argv, exit
+from bits import *
+
+MAX_ARGS = (1 << 11) - 1
+MAX_ARGS_BITLEN = (1 << 15) - 1
+OPERATOR_TYPES = (TYPE_SUM, TYPE_PRODUCT, TYPE_MIN, TYPE_MAX, TYPE_GT, TYPE_LT, TYPE_EQ)
+
+
+def random_packet(max_depth=6, rng=None, depth=0):
+    """Returns a random packet in (version, packet type, args) format, in which
+    operator packets are nested at most max_depth levels deep."""
+    rng = rng or Random()
+    version = rng.randrange(8)
+    if depth >= max_depth or rng.randrange(3) == 0:
+        return version, TYPE_LITERAL, rng.randrange(1 << rng.choice((4, 8, 16, 32)))
+    packet_type = rng.choice(OPERATOR_TYPES)
+    nr_of_args = 2 if packet_type in COMPARISON_TYPES else rng.randint(1, 4)
+    args = [random_packet(max_depth, rng, depth + 1) for _ in range(nr_of_args)]
+    return version, packet_type, args
+
+
+def encode_packet(ast, rng=None):
+    """Returns the bits for a packet as a string of "0" and "1" characters.
+    The length type for operator packets is picked at random."""
+    rng = rng or Random()
+    version, packet_type, args = ast
+    if packet_type == TYPE_LITERAL:
+        return f"{version:03b}{packet_type:03b}" + encode_literal(args)
+    sub_packets = [encode_packet(arg, rng) for arg in args]
+    return encode_operator(version, packet_type, sub_packets, rng.randrange(2))
+
+
+def encode_literal(value):
+    nibbles = f"{value:b}"
+    nibbles = nibbles.zfill((len(nibbles) + 3) // 4 * 4)
+    groups = [nibbles[i:i + 4] for i in range(0, len(nibbles), 4)]
+    return "".join(f"1{group}" for group in groups[:-1]) + f"0{groups[-1]}"
+
+
+def encode_operator(version, packet_type, sub_packets, length_type=0):
+    """Returns the bits for an operator packet, given the already encoded
+    sub-packets. The length type is switched when the sub-packets do not
+    fit the requested one."""
+    bits = "".join(sub_packets)
+    if length_type == 0 and len(bits) > MAX_ARGS_BITLEN:
+        length_type = 1
+    if length_type == 1 and len(sub_packets) > MAX_ARGS:
+        length_type = 0
+    if length_type == 0:
+        if len(bits) > MAX_ARGS_BITLEN:
+            raise BitsException("Too many sub-packets for one operator packet")
+        header = f"0{len(bits):015b}"
+    else:
+        header = f"1{len(sub_packets):011b}"
+    return f"{version:03b}{packet_type:03b}{header}{bits}"
+
+
+def bits_to_hex(bits):
+    """Converts a string of bits to hexadecimal, padding it with zero bits
+    up to a full number of bytes."""
+    bits = bits.ljust((len(bits) + 7) // 8 * 8, "0")
+    return f"{int(bits, 2):0{len(bits) // 4}X}" if bits else ""
+
+
+def generate_transmission(size, max_depth=6, seed=None):
+    """Returns a random hexadecimal transmission of at least size bytes."""
+    rng = Random(seed)
+    packets = []
+    bitlen = 0
+    while bitlen < size * 8:
+        packets.append(encode_packet(random_packet(max_depth, rng), rng))
+        bitlen += len(packets[-1])
+    while len(packets) > 1:
+        packets = [
+            encode_operator(0, TYPE_SUM, packets[i:i + MAX_ARGS], 1)
+            for i in range(0, len(packets), MAX_ARGS)
+        ]
+    return bits_to_hex(packets[0])
+
+
+def generate_capture(count, max_depth=6, seed=None):
+    """Returns a random hexadecimal capture of count concatenated top-level
+    packets, each of them padded with zero bits up to a full number of bytes."""
+    rng = Random(seed)
+    return "".join(
+        bits_to_hex(encode_packet(random_packet(max_depth, rng), rng))
+        for _ in range(count)
+    )
+
+
+if __name__ == "__main__":
+    capture = len(argv) > 1 and argv[1] == "--capture"
+    args = argv[2:] if capture else argv[1:]
+    if not 1 <= len(args) <= 3:
+        print(f"Usage: {argv[0]} <size in bytes> [<max depth>] [<seed>]")
+        print(f"       {argv[0]} --capture <number of packets> [<max depth>] [<seed>]")
+        exit(1)
+    size = int(args[0])
+    max_depth = int(args[1]) if len(args) > 1 else 6
+    seed = int(args[2]) if len(args) > 2 else None
+    if capture:
+        print(generate_capture(size, max_depth, seed))
+    else:
+        print(generate_transmission(size, max_depth, seed))
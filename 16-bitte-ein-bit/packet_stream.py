@@ -0,0 +1,35 @@
+#!/bin/env python3
+#
+# Usage: packet_stream.py <file> [<align>]
+#
+# Decodes a capture of concatenated top-level BITS packets (see iter_packets()
+# in bits.py), and writes the version sum and the value for every packet as
+# soon as it is decoded. The file is memory-mapped and decoded in chunks, so
+# memory use does not grow with the size of the capture. The throughput is
+# reported on stderr at the end:
+#   ./bits_generator.py --capture 100000 > capture.txt
+#   ./packet_stream.py capture.txt
+
+from sys import argv, exit, stderr
+from time import perf_counter
+from bits import *
+
+
+if __name__ == "__main__":
+    if not 2 <= len(argv) <= 3:
+        print(f"Usage: {argv[0]} <file> [<align>]")
+        exit(1)
+    align = int(argv[2]) if len(argv) > 2 else 8
+
+    started = perf_counter()
+    count = 0
+    try:
+        for version_sum, value in iter_packet_results(argv[1], align):
+            print(f"{version_sum} {value}")
+            count += 1
+    except BitsException as e:
+        print(f"Decoding failed after {count} packets: {e}", file=stderr)
+        exit(2)
+    elapsed = perf_counter() - started
+    rate = count / elapsed if elapsed else 0
+    print(f"Decoded {count} packets, {elapsed:.3f}s ({rate:.0f} packets/sec)", file=stderr)
@@ -0,0 +1,249 @@
+#!/bin/env python3
+#
+# This script contains unit tests for the bits module.
+
+import os
+import sys
+import tempfile
+import unittest
+from random import Random
+from bits import *
+from bits_generator import *
+
+# (version sum, value) for the example transmissions example1.txt - example15.txt.
+EXAMPLES = [
+    (6, 2021), (9, 1), (14, 3), (16, 15), (12, 46), (23, 46), (31, 54), (14, 3),
+    (8, 54), (15, 7), (11, 9), (13, 1), (19, 0), (16, 0), (20, 1),
+]
+
+
+def read_example(number):
+    with open(f"example{number}.txt", "r") as f:
+        return f.read().strip()
+
+
+def make_literal(value, version=0):
+    return f"{version:03b}{TYPE_LITERAL:03b}" + encode_literal(value)
+
+
+def make_nested_sums(depth, value=42):
+    """Returns the hexadecimal transmission for depth nested sum packets
+    (version 1) around a single literal packet (version 2)."""
+    bits = make_literal(value, 2)
+    for length_type in [i % 2 for i in range(depth)]:
+        bits = encode_operator(1, TYPE_SUM, [bits], length_type)
+    return bits_to_hex(bits)
+
+
+def decode_with_reference(hexstring):
+    return parse_bitstream(hexstream_to_bitstream(iter(hexstring)))
+
+
+class TestDecoder(unittest.TestCase):
+    def test_examples(self):
+        for number, (version_sum, value) in enumerate(EXAMPLES, 1):
+            with self.subTest(example=number):
+                ast = decode_hex(read_example(number))
+                self.assertEqual(version_sum, sum_versions(ast))
+                self.assertEqual(value, evaluate(ast))
+
+    def test_decodes_literal(self):
+        self.assertEqual((6, TYPE_LITERAL, 2021), decode_hex("D2FE28"))
+
+    def test_decodes_operator_with_both_length_types(self):
+        self.assertEqual(
+            (1, TYPE_LT, [(6, TYPE_LITERAL, 10), (2, TYPE_LITERAL, 20)]),
+            decode_hex("38006F45291200"))
+        self.assertEqual(
+            (7, TYPE_MAX, [(2, TYPE_LITERAL, 1), (4, TYPE_LITERAL, 2), (1, TYPE_LITERAL, 3)]),
+            decode_hex("EE00D40C823060"))
+
+    def test_matches_reference_decoder(self):
+        for seed in range(5):
+            hexstring = generate_transmission(2000, seed=seed)
+            with self.subTest(seed=seed):
+                self.assertEqual(decode_with_reference(hexstring), decode_hex(hexstring))
+
+    def test_decodes_literals_spanning_multiple_words(self):
+        value = (1 << 200) - 12345
+        self.assertEqual((0, TYPE_LITERAL, value), decode_hex(bits_to_hex(make_literal(value))))
+
+    def test_odd_number_of_hex_digits(self):
+        self.assertEqual(decode_hex("38006F45291200"), decode_hex("38006F4529120"))
+
+    def test_whitespace_is_ignored(self):
+        self.assertEqual(decode_hex("38006F45291200"), decode_hex(" 38006F4\n52912\r\n00\n"))
+
+    def test_lowercase_hex_digits(self):
+        self.assertEqual(decode_hex("EE00D40C823060"), decode_hex("ee00d40c823060"))
+
+    def test_nesting_is_not_limited_by_recursion_limit(self):
+        depth = sys.getrecursionlimit() + 100
+        ast = decode_hex(make_nested_sums(depth))
+        self.assertEqual(depth + 2, sum_versions(ast))
+        self.assertEqual(42, evaluate(ast))
+
+    def test_exception_for_invalid_hex_digits(self):
+        with self.assertRaises(BitsException) as context:
+            decode_hex("D2FG28")
+        self.assertIn("Invalid hexadecimal transmission", str(context.exception))
+
+    def test_exception_for_truncated_transmission(self):
+        for hexstring in ["", "D2FE", "38006F45", "EE00D40C82"]:
+            with self.subTest(hexstring=hexstring):
+                with self.assertRaises(BitsException) as context:
+                    decode_hex(hexstring)
+                self.assertIn("Unexpected end of transmission", str(context.exception))
+
+    def test_exception_for_sub_packets_overrunning_their_length(self):
+        bits = f"000000{0:01b}{10:015b}" + make_literal(1)
+        with self.assertRaises(BitsException) as context:
+            decode_hex(bits_to_hex(bits))
+        self.assertIn("Sub-packets overrun their length by 1 bits", str(context.exception))
+
+    def test_exception_for_operator_without_sub_packets(self):
+        for hexstring in ["02000000", "0600"]:
+            with self.subTest(hexstring=hexstring):
+                with self.assertRaises(BitsException) as context:
+                    decode_hex(hexstring)
+                self.assertIn("without sub-packets", str(context.exception))
+
+
+class TestBitsExpression(unittest.TestCase):
+    def test_operators(self):
+        literals = [(0, TYPE_LITERAL, value) for value in (7, 3, 5)]
+        for packet_type, expected in [
+            (TYPE_SUM, 15), (TYPE_PRODUCT, 105), (TYPE_MIN, 3), (TYPE_MAX, 7),
+        ]:
+            with self.subTest(packet_type=packet_type):
+                self.assertEqual(expected, evaluate((0, packet_type, literals)))
+        for packet_type, expected in [(TYPE_GT, 1), (TYPE_LT, 0), (TYPE_EQ, 0)]:
+            with self.subTest(packet_type=packet_type):
+                self.assertEqual(expected, evaluate((0, packet_type, literals[:2])))
+
+    def test_compiled_expression_can_be_evaluated_multiple_times(self):
+        expression = compile_packet(decode_hex(read_example(15)))
+        self.assertEqual(1, expression.evaluate())
+        self.assertEqual(1, expression.evaluate())
+
+    def test_exception_for_comparison_without_two_sub_packets(self):
+        bits = encode_operator(0, TYPE_GT, [make_literal(1)] * 3)
+        with self.assertRaises(BitsException) as context:
+            evaluate(decode_hex(bits_to_hex(bits)))
+        self.assertIn("requires 2 sub-packets, got 3", str(context.exception))
+
+    def test_exception_for_unknown_packet_type(self):
+        with self.assertRaises(BitsException) as context:
+            evaluate((0, 8, [(0, TYPE_LITERAL, 1)]))
+        self.assertIn("Unknown packet type 8", str(context.exception))
+
+
+class TestHexFileReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, content):
+        path = os.path.join(self.tmp.name, "transmission.txt")
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def decode(self, path, chunk_size):
+        with file_to_reader(path, chunk_size) as reader:
+            return decode(reader)
+
+    def test_examples(self):
+        for number, (version_sum, _) in enumerate(EXAMPLES, 1):
+            with self.subTest(example=number):
+                self.assertEqual(version_sum, sum_versions(decode_file(f"example{number}.txt")))
+
+    def test_chunks_that_split_packets(self):
+        hexstring = generate_transmission(5000, seed=16)
+        expected = decode_hex(hexstring)
+        path = self.write(hexstring + "\n")
+        for chunk_size in [64, 65, 4097]:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(expected, self.decode(path, chunk_size))
+
+    def test_chunks_with_embedded_newlines(self):
+        hexstring = generate_transmission(5000, seed=17)
+        expected = decode_hex(hexstring)
+        lines = [hexstring[i:i + 77] for i in range(0, len(hexstring), 77)]
+        path = self.write("\r\n".join(lines) + "\n")
+        for chunk_size in [64, 65, 4097]:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(expected, self.decode(path, chunk_size))
+
+    def test_odd_number_of_hex_digits(self):
+        path = self.write("38006F4529120")
+        self.assertEqual(decode_hex("38006F45291200"), decode_file(path))
+
+    def test_exception_for_invalid_hex_digits(self):
+        hexstring = generate_transmission(1000, seed=18)
+        path = self.write(hexstring[:1000] + "X" + hexstring[1000:])
+        with self.assertRaises(BitsException) as context:
+            self.decode(path, 64)
+        self.assertIn("Invalid hexadecimal transmission", str(context.exception))
+
+    def test_exception_for_truncated_transmission(self):
+        hexstring = generate_transmission(1000, seed=18)
+        for content in ["", "\n", hexstring[:-4]]:
+            path = self.write(content)
+            with self.subTest(bytes=len(content)):
+                with self.assertRaises(BitsException) as context:
+                    self.decode(path, 64)
+                self.assertIn("Unexpected end of transmission", str(context.exception))
+
+
+class TestIterPackets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_decodes_concatenated_packets(self):
+        hexstring = "".join(read_example(number) for number in range(1, 16))
+        results = list(iter_packet_results(hex_to_reader(hexstring)))
+        self.assertEqual(EXAMPLES, results)
+
+    def test_capture_file_with_chunks_that_split_packets(self):
+        capture = generate_capture(200, seed=19)
+        expected = list(iter_packets(hex_to_reader(capture)))
+        self.assertEqual(200, len(expected))
+        path = os.path.join(self.tmp.name, "capture.txt")
+        with open(path, "w") as f:
+            f.write(capture + "\n")
+        self.assertEqual(expected, list(iter_packets(path)))
+        for chunk_size in [64, 65, 4097]:
+            with self.subTest(chunk_size=chunk_size):
+                with file_to_reader(path, chunk_size) as reader:
+                    self.assertEqual(expected, list(iter_packets(reader)))
+
+    def test_packets_aligned_to_single_bits(self):
+        rng = Random(20)
+        packets = [random_packet(4, rng) for _ in range(50)]
+        bits = "".join(encode_packet(packet, rng) for packet in packets)
+        reader = hex_to_reader(bits_to_hex(bits))
+        self.assertEqual(packets, list(iter_packets(reader, align=1)))
+
+    def test_empty_transmission(self):
+        self.assertEqual([], list(iter_packets(hex_to_reader(""))))
+
+    def test_trailing_zero_bytes_are_ignored(self):
+        for zero_bytes in range(6):
+            with self.subTest(zero_bytes=zero_bytes):
+                packets = list(iter_packets(hex_to_reader("D2FE28" + "00" * zero_bytes)))
+                self.assertEqual([(6, TYPE_LITERAL, 2021)], packets)
+
+    def test_exception_for_non_zero_padding_bits(self):
+        with self.assertRaises(BitsException) as context:
+            list(iter_packets(hex_to_reader("D2FE29D2FE28")))
+        self.assertIn("Non-zero padding bits before bit 24", str(context.exception))
+
+    def test_exception_for_non_zero_trailing_bits(self):
+        with self.assertRaises(BitsException) as context:
+            list(iter_packets(hex_to_reader("D2FE2800000100")))
+        self.assertIn("Unexpected trailing bits at bit 47", str(context.exception))
+
+
+unittest.main()
@@ -11,7 +11,7 @@ if len(argv) != 2:
     exit(1)
 
 with open(argv[1], "r") as f:
-    snails = [parse_snail_code(line.strip()) for line in f]
+    snails = list(parse_snail_lines(f))
 
 summed = reduce(add, snails)
 
@@ -0,0 +1,123 @@
+#!/bin/env python3
+#
+# This script benchmarks the snail number implementations on randomly
+# generated input (see snail_generator.py), so regressions become visible.
+#
+# Usage: benchmark.py [<number of lines>] [<max pair lines>] [<seed>]
+#
+# For snail_tree.py and snail_array.py, the following operations are timed
+# in-process: parsing, add+reduce of two numbers, summing the full list and
+# searching the max pair magnitude. The golf implementations are scripts
+# that read input.txt, so those are run as a subprocess on a generated
+# input.txt: golf1 scripts compute the full list sum, golf2 scripts the max
+# pair magnitude. The max pair search only uses the first <max pair lines>
+# lines, since its cost grows quadratically.
+#
+# Peak memory is measured using tracemalloc for in-process operations (in a
+# separate run, since tracing slows things down) and as the max RSS for
+# subprocesses.
+
+import os
+import subprocess
+import tracemalloc
+from functools import reduce
+from glob import glob
+from itertools import permutations
+from operator import add
+from sys import argv, executable
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from snail_tree import parse_snail_code
+from snail_array import parse_snail_array, max_pair_magnitude
+from snail_generator import generate_snail_codes
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def tree_max_pair_magnitude(codes):
+    # Operands are parsed for every pair, since adding trees reuses their nodes.
+    return max(
+        (parse_snail_code(a) + parse_snail_code(b)).magnitude()
+        for a, b in permutations(codes, 2)
+    )
+
+
+def make_operations(name, parse, max_pair, lines, pair_lines):
+    """Returns (operation, number of ops, prepare, run) tuples. The prepare
+    function is called outside the measurement; its result is passed to run."""
+    pairs = list(zip(lines, lines[1:]))
+    return [
+        (f"{name} parse", len(lines),
+         lambda: lines,
+         lambda codes: [parse(code) for code in codes]),
+        (f"{name} add+reduce", len(pairs),
+         lambda: [(parse(a), parse(b)) for a, b in pairs],
+         lambda operands: [a + b for a, b in operands]),
+        (f"{name} sum", len(lines) - 1,
+         lambda: [parse(code) for code in lines],
+         lambda snails: reduce(add, snails).magnitude()),
+        (f"{name} max pair", len(pair_lines) * (len(pair_lines) - 1),
+         lambda: pair_lines,
+         max_pair),
+    ]
+
+
+def measure(prepare, run):
+    data = prepare()
+    started = perf_counter()
+    run(data)
+    elapsed = perf_counter() - started
+
+    data = prepare()
+    tracemalloc.start()
+    run(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def measure_script(path, lines):
+    with TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "input.txt"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+        started = perf_counter()
+        process = subprocess.Popen([executable, path], cwd=tmp, stdout=subprocess.DEVNULL)
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = perf_counter() - started
+        process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"{path} exited with status {process.returncode}")
+    # ru_maxrss is reported in kilobytes on Linux.
+    return elapsed, usage.ru_maxrss * 1024
+
+
+def report(operation, ops, elapsed, peak):
+    rate = ops / elapsed if elapsed else 0
+    print(f"{operation:32s} {ops:9d} {elapsed:9.3f}s {rate:12.0f} {peak / 1024:10.0f}")
+
+
+count = int(argv[1]) if len(argv) > 1 else 1000
+pair_count = int(argv[2]) if len(argv) > 2 else 100
+seed = int(argv[3]) if len(argv) > 3 else 2021
+
+lines = generate_snail_codes(count, seed=seed)
+pair_lines = lines[:pair_count]
+
+print(f"{'operation':32s} {'ops':>9s} {'time':>10s} {'ops/sec':>12s} {'peak KB':>10s}")
+operations = (
+    make_operations("snail_tree", parse_snail_code, tree_max_pair_magnitude,
+                    lines, pair_lines) +
+    make_operations("snail_array", parse_snail_array,
+                    lambda codes: max_pair_magnitude(codes, workers=1),
+                    lines, pair_lines)
+)
+for operation, ops, prepare, run in operations:
+    report(operation, ops, *measure(prepare, run))
+
+for path in sorted(glob(os.path.join(HERE, "golf*.py"))):
+    name = os.path.basename(path)
+    if name.startswith("golf1"):
+        report(f"{name} sum", len(lines) - 1, *measure_script(path, lines))
+    else:
+        ops = len(pair_lines) * (len(pair_lines) - 1)
+        report(f"{name} max pair", ops, *measure_script(path, pair_lines))
@@ -0,0 +1,34 @@
+#!/bin/env python3
+#
+# This script compares the speed of the snail number parsers on randomly
+# generated snail code.
+#
+# Usage: benchmark_parser.py [<number of lines>] [<max depth>]
+
+from sys import argv
+from time import perf_counter
+from snail_tree import SnailParser, SnailTokenParser
+from snail_array import parse_snail_array
+from snail_generator import generate_snail_codes
+
+
+def benchmark(name, parse, lines):
+    started = perf_counter()
+    for line in lines:
+        parse(line)
+    elapsed = perf_counter() - started
+    size = sum(map(len, lines)) / 1024 / 1024
+    print(f"{name:20s} {elapsed:8.3f}s  {size / elapsed:8.2f} MB/s")
+    return elapsed
+
+
+count = int(argv[1]) if len(argv) > 1 else 20000
+max_depth = int(argv[2]) if len(argv) > 2 else 4
+
+lines = generate_snail_codes(count, max_depth, seed=2021)
+print(f"Parsing {count} lines, {sum(map(len, lines))} bytes, max depth {max_depth}")
+
+baseline = benchmark("SnailParser", SnailParser().parse, lines)
+tokens = benchmark("SnailTokenParser", SnailTokenParser().parse, lines)
+benchmark("parse_snail_array", parse_snail_array, lines)
+print(f"SnailTokenParser speedup: {baseline / tokens:.2f}x")
@@ -0,0 +1,195 @@
+#!/bin/env python3
+#
+# An alternative representation for snail numbers, in which a number is
+# stored as a flat list of its regular numbers, together with the depth
+# at which each regular number lives. The pair structure itself is not
+# stored, since it can be derived from the depths.
+#
+# Exploding and splitting become simple list operations, without having
+# to walk a tree of node objects to find the neighbouring numbers.
+# The public API matches that of SnailRoot from snail_tree.py.
+
+from multiprocessing import Pool
+from os import cpu_count
+from snail_tree import SnailException, SnailParserException
+
+MAX_DEPTH = 4
+
+
+class SnailArray:
+    def __init__(self, values=None, depths=None):
+        self.values = [0, 0] if values is None else values
+        self.depths = [1, 1] if depths is None else depths
+        if len(self.values) != len(self.depths):
+            raise SnailException("The number of values and depths must match")
+
+    def copy(self):
+        return SnailArray(list(self.values), list(self.depths))
+
+    def __add__(self, other: "SnailArray"):
+        summed = SnailArray(
+            self.values + other.values,
+            [depth + 1 for depth in self.depths + other.depths],
+        )
+        summed.reduce()
+        return summed
+
+    def reduce(self):
+        reduced = False
+        while self.explode() or self.split():
+            reduced = True
+        return reduced
+
+    def explode(self):
+        """Explodes the leftmost pair that is nested inside four pairs.
+        Such a pair always consists of two regular numbers, which are
+        next to each other in the list. Returns True when a pair exploded."""
+        values, depths = self.values, self.depths
+        for i, depth in enumerate(depths):
+            if depth > MAX_DEPTH:
+                if i > 0:
+                    values[i - 1] += values[i]
+                if i + 2 < len(values):
+                    values[i + 2] += values[i + 1]
+                values[i:i + 2] = [0]
+                depths[i:i + 2] = [depth - 1]
+                return True
+        return False
+
+    def split(self):
+        """Splits the leftmost regular number that is 10 or greater.
+        Returns True when a number was split."""
+        values, depths = self.values, self.depths
+        for i, value in enumerate(values):
+            if value > 9:
+                left = value // 2
+                values[i:i + 1] = [left, value - left]
+                depths[i:i + 1] = [depths[i] + 1] * 2
+                return True
+        return False
+
+    def magnitude(self):
+        # Regular numbers that are next to each other at the same depth
+        # form a pair, which is collapsed into its magnitude one level up.
+        stack = []
+        for value, depth in zip(self.values, self.depths):
+            while stack and stack[-1][1] == depth:
+                left, _ = stack.pop()
+                value = 3 * left + 2 * value
+                depth -= 1
+            stack.append((value, depth))
+        return stack[0][0]
+
+    def __str__(self):
+        parts = []
+        index = 0
+
+        def format_node(depth):
+            nonlocal index
+            if self.depths[index] == depth:
+                parts.append(str(self.values[index]))
+                index += 1
+            else:
+                parts.append("[")
+                format_node(depth + 1)
+                parts.append(",")
+                format_node(depth + 1)
+                parts.append("]")
+
+        format_node(0)
+        return "".join(parts)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, SnailArray)
+            and self.values == other.values
+            and self.depths == other.depths
+        )
+
+
+def parse_snail_array(code):
+    """Parses snail code into a SnailArray. Syntax errors are reported using
+    a SnailParserException, with the same messages and positions as the
+    SnailParser from snail_tree.py."""
+    values = []
+    depths = []
+    stack = []
+    expect_node = True
+    index = 0
+    length = len(code)
+    if length and code[0] != "[":
+        raise SnailParserException(f"Expected opening '[', got '{code[0]}'", 0)
+    while index < length:
+        c = code[index]
+        if expect_node:
+            if c == "[":
+                stack.append(0)
+                index += 1
+            elif c.isdigit():
+                end = index + 1
+                while end < length and code[end].isdigit():
+                    end += 1
+                values.append(int(code[index:end]))
+                depths.append(len(stack))
+                index = end
+                expect_node = False
+            else:
+                raise SnailParserException(
+                    f"Expected node start (opening '[' or digit), got '{c}'", index
+                )
+        elif stack[-1] == 0:
+            if c != ",":
+                raise SnailParserException(
+                    f"Expected separator ',', got '{c}", index + 1
+                )
+            stack[-1] = 1
+            expect_node = True
+            index += 1
+        else:
+            if c != "]":
+                raise SnailParserException(
+                    f"Expected closing ']', got '{c}", index + 1
+                )
+            stack.pop()
+            index += 1
+            if not stack and index < length:
+                raise SnailParserException(
+                    "Extraneous input after closing ']'", index
+                )
+    if stack or expect_node:
+        raise SnailParserException("Unexpected end of input", length)
+    return SnailArray(values, depths)
+
+
+def max_pair_magnitude(codes, workers=None):
+    """Returns the largest magnitude that can be produced by adding two
+    different snail numbers from the provided lines of snail code.
+    Every line is parsed only once. Since adding SnailArrays does not
+    modify the operands, they can be reused for every pair.
+
+    The rows of the pair grid are spread over a pool of worker processes.
+    With workers=1, everything is computed in the current process."""
+    snails = [parse_snail_array(code.strip()) for code in codes if code.strip()]
+    workers = workers or cpu_count()
+    if workers == 1 or len(snails) < 2:
+        _init_pair_worker(snails)
+        return max(map(_max_row_magnitude, range(len(snails))), default=0)
+    chunksize = max(1, len(snails) // (workers * 4))
+    with Pool(workers, initializer=_init_pair_worker, initargs=(snails,)) as pool:
+        return max(pool.imap_unordered(
+            _max_row_magnitude, range(len(snails)), chunksize=chunksize
+        ))
+
+
+def _init_pair_worker(snails):
+    global _pair_snails
+    _pair_snails = snails
+
+
+def _max_row_magnitude(index):
+    left = _pair_snails[index]
+    return max(
+        ((left + right).magnitude()
+         for other, right in enumerate(_pair_snails) if other != index),
+        default=0
+    )
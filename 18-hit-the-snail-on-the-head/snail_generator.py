@@ -0,0 +1,45 @@
+#!/bin/env python3
+#
+# This script generates random snail numbers, that can be used as input
+# for testing and benchmarking the snail number implementations.
+#
+# Usage: snail_generator.py <number of lines> [<max depth>] [<seed>]
+#
+# With a max depth of 4 (the default), the generated numbers are valid
+# homework input: they are already reduced, since no pair is nested inside
+# four pairs and all regular numbers are below 10. A larger max depth
+# produces numbers that need reducing.
+
+from random import Random
+from sys import argv, exit
+
+
+def random_snail_code(max_depth=4, rng=None, depth=1):
+    """Returns the code for a random snail number in which pairs are nested
+    at most max_depth levels deep (counting the outer pair as level 1)."""
+    rng = rng or Random()
+    left = _random_node(max_depth, rng, depth + 1)
+    right = _random_node(max_depth, rng, depth + 1)
+    return f"[{left},{right}]"
+
+
+def _random_node(max_depth, rng, depth):
+    if depth > max_depth or rng.randrange(3) == 0:
+        return str(rng.randrange(10))
+    return random_snail_code(max_depth, rng, depth)
+
+
+def generate_snail_codes(count, max_depth=4, seed=None):
+    rng = Random(seed)
+    return [random_snail_code(max_depth, rng) for _ in range(count)]
+
+
+if __name__ == "__main__":
+    if not 2 <= len(argv) <= 4:
+        print(f"Usage: {argv[0]} <number of lines> [<max depth>] [<seed>]")
+        exit(1)
+    count = int(argv[1])
+    max_depth = int(argv[2]) if len(argv) > 2 else 4
+    seed = int(argv[3]) if len(argv) > 3 else None
+    for code in generate_snail_codes(count, max_depth, seed):
+        print(code)
@@ -1,5 +1,6 @@
 #!/bin/env python3
 
+import json
 from collections.abc import Iterable
 
 
@@ -7,12 +8,23 @@ class SnailException(Exception):
     pass
 
 
+class SnailVisitorStop(Exception):
+    pass
+
+
 class SnailVisitor:
     def __init__(self, node):
         self.node = node
 
     def run(self):
-        self.node.accept(self)
+        try:
+            self.node.accept(self)
+        except SnailVisitorStop:
+            pass
+
+    def stop(self):
+        """Can be called from a visit method to end the traversal."""
+        raise SnailVisitorStop()
 
     def visit_pair_start(self, pair):
         pass
@@ -28,6 +40,8 @@ class SnailVisitor:
 
 
 class SnailNode:
+    __slots__ = ("parent",)
+
     def __init__(self):
         self.parent = None
 
@@ -42,10 +56,23 @@ class SnailNode:
         computer = SnailMagnitudeComputer(self)
         return computer.run()
 
+    def invalidate(self):
+        """Clears the cached magnitude and string form of this node and all
+        of its ancestors. Must be called when the subtree is modified."""
+        node = self
+        while node is not None:
+            node.clear_cache()
+            node = node.parent
+
+    def clear_cache(self):
+        pass
+
 
 class SnailNumber(SnailNode):
+    __slots__ = ("value",)
+
     def __init__(self, value: int):
-        super().__init__()
+        self.parent = None
         self.value = value
 
     def accept(self, visitor: SnailVisitor):
@@ -53,17 +80,32 @@ class SnailNumber(SnailNode):
 
     def set_value(self, value: int):
         self.value = value
+        if self.parent is not None:
+            self.parent.invalidate()
+
+    def __str__(self):
+        return str(self.value)
+
+    def magnitude(self):
+        return self.value
 
 
 class SnailPair(SnailNode):
+    """A pair caches its magnitude and string form, so these are only
+    recomputed for the subtrees that were modified since the last time."""
+
+    __slots__ = ("left", "right", "_magnitude", "_string")
+
     def __init__(
         self, left: SnailNode = SnailNumber(0), right: SnailNode = SnailNumber(0)
     ):
-        super().__init__()
+        self.parent = None
+        self._magnitude = None
+        self._string = None
         self.left = left
-        self.left.parent = self
+        left.parent = self
         self.right = right
-        self.right.parent = self
+        right.parent = self
 
     def replace_child(self, orig: SnailNode, replacement: SnailNode):
         if self.left == orig:
@@ -74,6 +116,11 @@ class SnailPair(SnailNode):
             replacement.parent = self
         else:
             raise SnailException("Node to replace is not a child of this parent")
+        self.invalidate()
+
+    def clear_cache(self):
+        self._magnitude = None
+        self._string = None
 
     def accept(self, visitor: SnailVisitor):
         visitor.visit_pair_start(self)
@@ -82,6 +129,16 @@ class SnailPair(SnailNode):
         self.right.accept(visitor)
         visitor.visit_pair_end(self)
 
+    def __str__(self):
+        if self._string is None:
+            self._string = f"[{self.left},{self.right}]"
+        return self._string
+
+    def magnitude(self):
+        if self._magnitude is None:
+            self._magnitude = 3 * self.left.magnitude() + 2 * self.right.magnitude()
+        return self._magnitude
+
 
 class SnailRoot(SnailPair):
     def __init__(
@@ -100,12 +157,7 @@ class SnailRoot(SnailPair):
         return summed
 
     def reduce(self):
-        exploder = SnailExploder(self)
-        splitter = SnailSplitter(self)
-        reduced = False
-        while exploder.run() or splitter.run():
-            reduced = True
-        return reduced
+        return SnailReducer(self).run()
 
 
 class SnailStringFormatter(SnailVisitor):
@@ -113,21 +165,21 @@ class SnailStringFormatter(SnailVisitor):
         super().__init__(node)
 
     def run(self):
-        self.result = ""
+        self.parts = []
         super().run()
-        return self.result
+        return "".join(self.parts)
 
     def visit_number(self, node: SnailNode):
-        self.result += str(node.value)
+        self.parts.append(str(node.value))
 
     def visit_pair_start(self, node: SnailNode):
-        self.result += "["
+        self.parts.append("[")
 
     def visit_pair(self, node: SnailNode):
-        self.result += ","
+        self.parts.append(",")
 
     def visit_pair_end(self, node: SnailNode):
-        self.result += "]"
+        self.parts.append("]")
 
 
 class SnailExploder(SnailVisitor):
@@ -164,6 +216,7 @@ class SnailExploder(SnailVisitor):
         modify_closest_number(left=False)
         pair.replace_with(SnailNumber(0))
         self.exploded = True
+        self.stop()
 
     def visit_pair_end(self, pair: SnailPair):
         self.depth -= 1
@@ -184,6 +237,92 @@ class SnailSplitter(SnailVisitor):
             right = number.value - left
             number.replace_with(SnailPair(SnailNumber(left), SnailNumber(right)))
             self.splitted = True
+            self.stop()
+
+
+class SnailLeafCollector(SnailVisitor):
+    """Collects all regular numbers from left to right, together with
+    their depth (the number of pairs that they are nested in)."""
+
+    def __init__(self, node: SnailNode):
+        super().__init__(node)
+
+    def run(self):
+        self.depth = 0
+        self.numbers = []
+        self.depths = []
+        super().run()
+        return self.numbers, self.depths
+
+    def visit_pair_start(self, pair: SnailPair):
+        self.depth += 1
+
+    def visit_pair_end(self, pair: SnailPair):
+        self.depth -= 1
+
+    def visit_number(self, number: SnailNumber):
+        self.numbers.append(number)
+        self.depths.append(self.depth)
+
+
+class SnailReducer:
+    """Reduces a snail number, giving the same result as repeatedly running
+    the SnailExploder and SnailSplitter from the root, but without
+    walking the tree again after every action.
+
+    The regular numbers are collected once, from left to right. Because
+    only an addition can produce pairs that must explode, all of these are
+    exploded in a single sweep first. After that, splits are done from left
+    to right. A split can create one pair that must explode, which then
+    happens right away. Only the number to the left of that pair can have
+    become too large, so the search for the next split resumes there."""
+
+    def __init__(self, node: SnailNode):
+        self.node = node
+
+    def run(self):
+        self.numbers, self.depths = SnailLeafCollector(self.node).run()
+        reduced = False
+
+        index = 0
+        while index < len(self.numbers):
+            if self.depths[index] > 4:
+                self._explode(index)
+                reduced = True
+            index += 1
+
+        index = 0
+        while index < len(self.numbers):
+            if self.numbers[index].value > 9:
+                self._split(index)
+                reduced = True
+                if self.depths[index] > 4:
+                    self._explode(index)
+                    index = max(0, index - 1)
+            else:
+                index += 1
+
+        return reduced
+
+    def _explode(self, index):
+        numbers = self.numbers
+        left, right = numbers[index], numbers[index + 1]
+        if index > 0:
+            numbers[index - 1].set_value(numbers[index - 1].value + left.value)
+        if index + 2 < len(numbers):
+            numbers[index + 2].set_value(numbers[index + 2].value + right.value)
+        zero = SnailNumber(0)
+        left.parent.replace_with(zero)
+        numbers[index:index + 2] = [zero]
+        self.depths[index:index + 2] = [self.depths[index] - 1]
+
+    def _split(self, index):
+        number = self.numbers[index]
+        left = SnailNumber(number.value // 2)
+        right = SnailNumber(number.value - left.value)
+        number.replace_with(SnailPair(left, right))
+        self.numbers[index:index + 1] = [left, right]
+        self.depths[index:index + 1] = [self.depths[index] + 1] * 2
 
 
 class SnailMagnitudeComputer(SnailVisitor):
@@ -212,9 +351,10 @@ class SnailMagnitudeComputer(SnailVisitor):
 
 
 class SnailParserException(Exception):
-    def __init__(self, msg, pos):
-        super().__init__(msg)
+    def __init__(self, msg, pos, line=None):
+        super().__init__(msg if line is None else f"Line {line}: {msg}")
         self.pos = pos
+        self.line = line
 
 
 class SnailParser:
@@ -272,6 +412,56 @@ class SnailParser:
         self._error(f"Expected node start (opening '[' or digit), got '{c}'")
 
 
+class SnailTokenParser:
+    """A faster alternative for the SnailParser. Instead of handling the
+    input one character at a time through method calls, the tokenizing is
+    left to the json module (snail code is a subset of JSON), after which
+    the tree is built from the resulting nested lists.
+
+    Input that is not valid snail code is handed to the SnailParser, so
+    syntax errors are reported with exactly the same messages and positions.
+    """
+
+    SNAIL_CHARS = str.maketrans("", "", "[],0123456789")
+
+    def parse(self, code):
+        if code.translate(self.SNAIL_CHARS) == "":
+            try:
+                pair = json.loads(code)
+                if type(pair) is list and len(pair) == 2:
+                    return SnailRoot(self._build(pair[0]), self._build(pair[1]))
+            except (ValueError, RecursionError):
+                pass
+        return SnailParser().parse(code)
+
+    def _build(self, node):
+        if type(node) is int:
+            return SnailNumber(node)
+        left, right = node
+        return SnailPair(
+            SnailNumber(left) if type(left) is int else self._build(left),
+            SnailNumber(right) if type(right) is int else self._build(right),
+        )
+
+    def parse_lines(self, lines):
+        """Parses lines of snail code (e.g. an open sum file), yielding a
+        root for every non-empty line. Syntax errors also report the line
+        number at which they occurred."""
+        for line_number, line in enumerate(lines, start=1):
+            code = line.strip()
+            if not code:
+                continue
+            try:
+                yield self.parse(code)
+            except SnailParserException as e:
+                raise SnailParserException(e.args[0], e.pos, line_number) from None
+
+
 def parse_snail_code(code):
-    parser = SnailParser()
+    parser = SnailTokenParser()
     return parser.parse(code)
+
+
+def parse_snail_lines(lines):
+    parser = SnailTokenParser()
+    return parser.parse_lines(lines)
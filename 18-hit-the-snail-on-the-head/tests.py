@@ -1,7 +1,11 @@
 #!/bin/env python3
 
 import unittest
+from functools import reduce
+from operator import add
 from snail_tree import *
+from snail_array import *
+from snail_generator import generate_snail_codes
 
 
 class TestSnailNodes(unittest.TestCase):
@@ -110,11 +114,12 @@ class TestSnailVisitor(unittest.TestCase):
 
 
 class TestSnailParser(unittest.TestCase):
+    parse = staticmethod(parse_snail_code)
+
     def test_can_create_parser(self):
         parser = SnailParser()
 
     def test_parser_cases(self):
-        parser = SnailParser()
         for code in [
             "[0,0]",
             "[1,2]",
@@ -124,7 +129,7 @@ class TestSnailParser(unittest.TestCase):
             "[[[1,[3,4]],5],[6,[7,[8,9]]]]",
         ]:
             with self.subTest():
-                root = parser.parse(code)
+                root = self.parse(code)
                 self.assertEqual(code, str(root))
 
     def test_parser_error_cases(self):
@@ -146,15 +151,35 @@ class TestSnailParser(unittest.TestCase):
         ]:
             with self.subTest():
                 with self.assertRaises(SnailParserException) as context:
-                    parse_snail_code(code)
+                    self.parse(code)
                 self.assertEqual(error_pos, context.exception.pos)
                 self.assertIn(expected_in_msg, str(context.exception))
 
     def test_parse_snail_code_function(self):
-        root = parse_snail_code("[1,[2,[3,[4,[5,6]]]]]")
+        root = self.parse("[1,[2,[3,[4,[5,6]]]]]")
         self.assertEqual("[1,[2,[3,[4,[5,6]]]]]", str(root))
 
 
+class TestSnailRecursiveParser(TestSnailParser):
+    parse = staticmethod(lambda code: SnailParser().parse(code))
+
+
+class TestSnailParseLines(unittest.TestCase):
+    def test_parse_lines_yields_roots(self):
+        lines = ["[1,2]\n", "\n", "[[3,4],5]\n"]
+        roots = parse_snail_lines(lines)
+        self.assertEqual(["[1,2]", "[[3,4],5]"], [str(root) for root in roots])
+
+    def test_parse_lines_is_lazy(self):
+        roots = parse_snail_lines(["[1,2]", "[1,"])
+        self.assertEqual("[1,2]", str(next(roots)))
+        with self.assertRaises(SnailParserException) as context:
+            next(roots)
+        self.assertEqual(2, context.exception.line)
+        self.assertEqual(3, context.exception.pos)
+        self.assertIn("Line 2: Unexpected end", str(context.exception))
+
+
 class TestSnailExploder(unittest.TestCase):
     def test_explode_not(self):
         root = parse_snail_code("[9,9]")
@@ -246,38 +271,40 @@ class TestSnailSplitter(unittest.TestCase):
 
 
 class TestSnailReduce(unittest.TestCase):
+    parse = staticmethod(parse_snail_code)
+
     def test_reduce_not(self):
-        root = parse_snail_code("[9,9]")
+        root = self.parse("[9,9]")
         reduced = root.reduce()
         self.assertFalse(reduced)
         self.assertEqual("[9,9]", str(root))
 
     def test_reduce_one_explode(self):
-        root = parse_snail_code("[[[[[1,2],3],4],5],6]")
+        root = self.parse("[[[[[1,2],3],4],5],6]")
         reduced = root.reduce()
         self.assertTrue(reduced)
         self.assertEqual("[[[[0,5],4],5],6]", str(root))
 
     def test_reduce_two_explodes(self):
-        root = parse_snail_code("[[[[[1,2],[3,4]],5],6],7]")
+        root = self.parse("[[[[[1,2],[3,4]],5],6],7]")
         reduced = root.reduce()
         self.assertTrue(reduced)
         self.assertEqual("[[[[5,0],9],6],7]", str(root))
 
     def test_reduce_one_split(self):
-        root = parse_snail_code("[10,1]")
+        root = self.parse("[10,1]")
         reduced = root.reduce()
         self.assertTrue(reduced)
         self.assertEqual("[[5,5],1]", str(root))
 
     def test_reduce_two_splits(self):
-        root = parse_snail_code("[10,10]")
+        root = self.parse("[10,10]")
         reduced = root.reduce()
         self.assertTrue(reduced)
         self.assertEqual("[[5,5],[5,5]]", str(root))
 
     def test_reduce_buttload(self):
-        root = parse_snail_code("[[[[[1,6],[6,7]],8],[9,10]],11]")
+        root = self.parse("[[[[[1,6],[6,7]],8],[9,10]],11]")
         reduced = root.reduce()
         self.assertTrue(reduced)
         self.assertEqual("[[[[0,6],[7,8]],[9,[5,5]]],[5,6]]", str(root))
@@ -298,11 +325,55 @@ class TestSnailReduce(unittest.TestCase):
             ),
         ]:
             with self.subTest():
-                root = parse_snail_code(code)
+                root = self.parse(code)
                 root.reduce()
                 self.assertEqual(expected_reduced, str(root))
 
 
+class TestSnailReducer(unittest.TestCase):
+    def unreduced_sum(self, code1, code2):
+        a, b = parse_snail_code(code1), parse_snail_code(code2)
+        return SnailRoot(SnailPair(a.left, a.right), SnailPair(b.left, b.right))
+
+    def test_same_result_as_repeated_explode_and_split(self):
+        with open("example2.txt", "r") as f:
+            codes = [line.strip() for line in f]
+        for code1, code2 in zip(codes, codes[1:] + codes[:1]):
+            with self.subTest(code1=code1, code2=code2):
+                expected = self.unreduced_sum(code1, code2)
+                while SnailExploder(expected).run() or SnailSplitter(expected).run():
+                    pass
+                root = self.unreduced_sum(code1, code2)
+                self.assertTrue(SnailReducer(root).run())
+                self.assertEqual(str(expected), str(root))
+
+    def test_split_that_creates_pair_to_explode(self):
+        root = parse_snail_code("[[[[0,7],4],[15,[0,13]]],[1,1]]")
+        SnailReducer(root).run()
+        self.assertEqual("[[[[0,7],4],[[7,8],[6,0]]],[8,1]]", str(root))
+
+    def test_large_number_is_split_repeatedly(self):
+        root = parse_snail_code("[40,1]")
+        SnailReducer(root).run()
+        self.assertEqual("[[[[5,5],[5,5]],[[5,5],[5,5]]],1]", str(root))
+
+
+class TestSnailVisitorStop(unittest.TestCase):
+    def test_stop_ends_traversal(self):
+        class FirstNumberFinder(SnailVisitor):
+            def run(self):
+                self.visited = []
+                super().run()
+                return self.visited
+
+            def visit_number(self, number):
+                self.visited.append(number.value)
+                self.stop()
+
+        root = parse_snail_code("[[1,2],[3,4]]")
+        self.assertEqual([1], FirstNumberFinder(root).run())
+
+
 class TestSnailMagnitude(unittest.TestCase):
     def test_magnitude_simple(self):
         root = parse_snail_code("[1,2]")
@@ -339,4 +410,147 @@ class TestSnailMagnitude(unittest.TestCase):
         self.assertEqual(55, magnitude)
 
 
+class TestSnailCache(unittest.TestCase):
+    def test_magnitude_is_cached(self):
+        root = parse_snail_code("[[1,2],[3,4]]")
+        self.assertEqual(55, root.magnitude())
+        self.assertEqual(55, root._magnitude)
+        self.assertEqual(7, root.left._magnitude)
+
+    def test_set_value_invalidates_ancestors_only(self):
+        root = parse_snail_code("[[1,2],[3,4]]")
+        root.magnitude()
+        root.left.left.set_value(2)
+        self.assertIsNone(root._magnitude)
+        self.assertIsNone(root.left._magnitude)
+        self.assertEqual(17, root.right._magnitude)
+        self.assertEqual(64, root.magnitude())
+
+    def test_replace_invalidates_string_and_magnitude(self):
+        root = parse_snail_code("[[1,2],[3,4]]")
+        self.assertEqual("[[1,2],[3,4]]", str(root))
+        self.assertEqual(55, root.magnitude())
+        root.right.replace_with(SnailNumber(5))
+        self.assertEqual("[[1,2],5]", str(root))
+        self.assertEqual(31, root.magnitude())
+
+    def test_reduce_keeps_cache_consistent(self):
+        root = parse_snail_code("[[[[[4,3],4],4],[7,[[8,4],9]]],[1,1]]")
+        self.assertEqual("[[[[[4,3],4],4],[7,[[8,4],9]]],[1,1]]", str(root))
+        root.magnitude()
+        root.reduce()
+        self.assertEqual("[[[[0,7],4],[[7,8],[6,0]]],[8,1]]", str(root))
+        self.assertEqual(1384, root.magnitude())
+        self.assertEqual(str(root), SnailStringFormatter(root).run())
+        self.assertEqual(root.magnitude(), SnailMagnitudeComputer(root).run())
+
+
+class TestSnailSum(unittest.TestCase):
+    parse = staticmethod(parse_snail_code)
+
+    def test_sum_two_numbers(self):
+        summed = self.parse("[[[[4,3],4],4],[7,[[8,4],9]]]") + self.parse("[1,1]")
+        self.assertEqual("[[[[0,7],4],[[7,8],[6,0]]],[8,1]]", str(summed))
+
+    def test_sum_homework_example(self):
+        with open("example2.txt", "r") as f:
+            snails = [self.parse(line.strip()) for line in f]
+        summed = reduce(add, snails)
+        self.assertEqual(
+            "[[[[6,6],[7,6]],[[7,7],[7,0]]],[[[7,7],[7,7]],[[7,8],[9,9]]]]",
+            str(summed)
+        )
+        self.assertEqual(4140, summed.magnitude())
+
+    def test_magnitude_with_examples_from_assignment(self):
+        for code, expected_magnitude in [
+            ("[[1,2],[[3,4],5]]", 143),
+            ("[[[[0,7],4],[[7,8],[6,0]]],[8,1]]", 1384),
+            ("[[[[1,1],[2,2]],[3,3]],[4,4]]", 445),
+            ("[[[[8,7],[7,7]],[[8,6],[7,7]]],[[[0,7],[6,6]],[8,7]]]", 3488),
+        ]:
+            with self.subTest():
+                self.assertEqual(expected_magnitude, self.parse(code).magnitude())
+
+
+class TestSnailArrayParser(TestSnailParser):
+    parse = staticmethod(parse_snail_array)
+
+
+class TestSnailArrayReduce(TestSnailReduce):
+    parse = staticmethod(parse_snail_array)
+
+
+class TestSnailArraySum(TestSnailSum):
+    parse = staticmethod(parse_snail_array)
+
+
+class TestMaxPairMagnitude(unittest.TestCase):
+    def test_homework_example_in_process(self):
+        with open("example2.txt", "r") as f:
+            self.assertEqual(3993, max_pair_magnitude(f, workers=1))
+
+    def test_homework_example_with_pool(self):
+        with open("example2.txt", "r") as f:
+            self.assertEqual(3993, max_pair_magnitude(f, workers=2))
+
+    def test_pairs_are_not_commutative(self):
+        codes = [
+            "[[2,[[7,7],7]],[[5,8],[[9,3],[0,2]]]]",
+            "[[[0,[5,8]],[[1,7],[9,6]]],[[4,[1,2]],[[1,4],2]]]",
+        ]
+        self.assertEqual(3993, max_pair_magnitude(codes, workers=1))
+        self.assertEqual(3993, max_pair_magnitude(reversed(codes), workers=1))
+
+    def test_less_than_two_numbers(self):
+        self.assertEqual(0, max_pair_magnitude(["[1,2]"], workers=1))
+        self.assertEqual(0, max_pair_magnitude([], workers=1))
+
+
+class TestSnailArray(unittest.TestCase):
+    def test_can_create_array_without_arguments(self):
+        self.assertEqual("[0,0]", str(SnailArray()))
+
+    def test_stores_values_with_depths(self):
+        number = parse_snail_array("[[1,2],[[3,4],5]]")
+        self.assertEqual([1, 2, 3, 4, 5], number.values)
+        self.assertEqual([2, 2, 3, 3, 2], number.depths)
+
+    def test_add_does_not_modify_operands(self):
+        a = parse_snail_array("[[[[4,3],4],4],[7,[[8,4],9]]]")
+        b = parse_snail_array("[1,1]")
+        a + b
+        self.assertEqual("[[[[4,3],4],4],[7,[[8,4],9]]]", str(a))
+        self.assertEqual("[1,1]", str(b))
+
+    def test_explode_and_split_one_at_a_time(self):
+        number = parse_snail_array("[[[[[4,3],4],4],[7,[[8,4],9]]],[1,1]]")
+        self.assertTrue(number.explode())
+        self.assertEqual("[[[[0,7],4],[7,[[8,4],9]]],[1,1]]", str(number))
+        self.assertTrue(number.explode())
+        self.assertEqual("[[[[0,7],4],[15,[0,13]]],[1,1]]", str(number))
+        self.assertFalse(number.explode())
+        self.assertTrue(number.split())
+        self.assertEqual("[[[[0,7],4],[[7,8],[0,13]]],[1,1]]", str(number))
+
+
+class TestSnailGenerator(unittest.TestCase):
+    def test_generates_reduced_numbers(self):
+        for code in generate_snail_codes(50, seed=1):
+            with self.subTest(code=code):
+                root = parse_snail_code(code)
+                self.assertEqual(code, str(root))
+                self.assertFalse(root.reduce())
+
+    def test_max_depth_is_respected(self):
+        for code in generate_snail_codes(50, max_depth=2, seed=1):
+            with self.subTest(code=code):
+                self.assertLessEqual(max(parse_snail_array(code).depths), 2)
+
+    def test_seed_makes_output_reproducible(self):
+        self.assertEqual(
+            generate_snail_codes(10, seed=42), generate_snail_codes(10, seed=42)
+        )
+
+
 unittest.main()
@@ -0,0 +1,61 @@
+#!/bin/env python3
+#
+# This script compares the speed of the scanner alignment against the original
+# alignment (see align_reference() in scanners.py), on a randomly generated
+# field of scanners (see scanner_generator.py). Both are checked against the
+# expected number of beacons and maximum scanner distance.
+#
+# Usage: benchmark.py [<number of scanners>] [<beacons per scanner>] [<spacing>] [<seed>]
+#
+# The default is a dense field, in which many pairs of scanners overlap.
+
+from sys import argv, exit
+from time import perf_counter
+from scanners import *
+from scanner_generator import generate_scanners
+
+
+def benchmark(name, align_func, lines):
+    scanners = parse_scanners(lines)
+    started = perf_counter()
+    transformations = align_func(scanners)
+    elapsed = perf_counter() - started
+    beacons = {
+        pos
+        for scanner, transformation in transformations.items()
+        for pos in map(tuple, transformation.apply(scanner.orig_coords).tolist())
+    }
+    max_distance = max(
+        (sum(abs(p1 - p2) for p1, p2 in zip(a.shift, b.shift))
+         for a, b in combinations(transformations.values(), 2)),
+        default=0
+    )
+    print(f"{name:20s} {elapsed:8.3f}s {len(beacons):8d} {max_distance:8d}")
+    return elapsed, (len(beacons), max_distance)
+
+
+def align_in_process(scanners):
+    align(scanners, workers=1, verbose=False)
+    return {scanner: scanner.transformation for scanner in scanners}
+
+
+def align_in_pool(scanners):
+    align(scanners, verbose=False)
+    return {scanner: scanner.transformation for scanner in scanners}
+
+
+count = int(argv[1]) if len(argv) > 1 else 150
+beacons_per_scanner = int(argv[2]) if len(argv) > 2 else 25
+spacing = int(argv[3]) if len(argv) > 3 else 400
+seed = int(argv[4]) if len(argv) > 4 else 2021
+
+lines, *expected = generate_scanners(count, beacons_per_scanner, spacing, seed)
+print(f"Aligning {count} scanners, expecting {expected[0]} beacons and max distance {expected[1]}")
+print(f"{'alignment':20s} {'time':>9s} {'beacons':>8s} {'distance':>8s}")
+baseline, reference_result = benchmark("reference", align_reference, lines)
+in_process, result = benchmark("align (1 worker)", align_in_process, lines)
+_, pool_result = benchmark("align (pool)", align_in_pool, lines)
+if {reference_result, result, pool_result} != {tuple(expected)}:
+    print("The alignment results are not as expected!")
+    exit(1)
+print(f"Speedup: {baseline / in_process:.2f}x")
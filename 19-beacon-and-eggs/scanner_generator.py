@@ -0,0 +1,154 @@
+#!/bin/env python3
+#
+# This script generates random scanner reports, that can be used as input
+# for testing and benchmarking the scanner alignment.
+#
+# Usage: scanner_generator.py <number of scanners> [<beacons per scanner>] [<spacing>] [<seed>]
+#
+# Every new scanner is placed next to one of the last NEIGHBOURS scanners,
+# at about one range from it along one of the axes, after which random
+# beacons are added within its range. When possible, scanners are kept at
+# least <spacing> apart along some axis. The default spacing is one range, which
+# gives a sparse field like the puzzle input. A smaller spacing gives a dense
+# field, in which many scanners overlap. Beacons are added to the region that
+# the ranges of a new scanner and its parent share, until they share at least
+# MIN_SHARED beacons, so every scanner can be aligned. Finally,
+# every scanner reports the beacons within its range, relative to its own
+# position and in a random orientation.
+#
+# The expected number of beacons and maximum scanner distance are written
+# to stderr.
+
+from random import Random
+from sys import argv, exit, stderr
+from itertools import combinations
+
+RANGE = 1000
+MIN_SHARED = 25
+NEIGHBOURS = 5
+PLACEMENT_ATTEMPTS = 20
+
+# The 24 orientations, as (axis permutation, axis signs) pairs. Swapping two
+# axes mirrors the coordinates, which is undone by flipping an odd number of
+# axes.
+ORIENTATIONS = [
+    (axes, signs)
+    for axes, parity in [
+        ((0, 1, 2), 1), ((1, 2, 0), 1), ((2, 0, 1), 1),
+        ((1, 0, 2), -1), ((0, 2, 1), -1), ((2, 1, 0), -1),
+    ]
+    for signs in [(1, 1, 1), (-1, -1, 1), (-1, 1, -1), (1, -1, -1)]
+    for signs in [tuple(parity * s for s in signs)]
+]
+
+
+def in_range(scanner, beacon):
+    return all(abs(b - s) <= RANGE for s, b in zip(scanner, beacon))
+
+
+def random_position(rng, low, high):
+    return tuple(rng.randint(l, h) for l, h in zip(low, high))
+
+
+def place_scanner(scanners, spacing, rng):
+    """Returns a tuple of (parent scanner, new scanner position). The new scanner
+    is placed at spacing to 1.25 times spacing from the parent along one of the
+    axes. When possible, it is also kept at least spacing away from all other
+    scanners, so the field spreads out instead of piling up scanners."""
+    for _ in range(PLACEMENT_ATTEMPTS):
+        parent = rng.choice(scanners[-NEIGHBOURS:])
+        offset = [rng.randint(-spacing // 4, spacing // 4) for _ in range(3)]
+        offset[rng.randrange(3)] = rng.choice((-1, 1)) * rng.randint(spacing, spacing * 5 // 4)
+        scanner = tuple(p + o for p, o in zip(parent, offset))
+        if all(max(abs(s - o) for s, o in zip(scanner, other)) >= spacing for other in scanners):
+            break
+    return parent, scanner
+
+
+def generate_field(count, beacons_per_scanner=25, spacing=RANGE, seed=None):
+    """Returns a tuple of (scanner positions, beacon positions) for a field
+    of count scanners, in which every scanner can be aligned with the scanner
+    that it was placed next to."""
+    rng = Random(seed)
+    scanners = []
+    beacons = set()
+    for _ in range(count):
+        if scanners:
+            parent, scanner = place_scanner(scanners, spacing, rng)
+        else:
+            parent = scanner = (0, 0, 0)
+        scanners.append(scanner)
+        low = tuple(p - RANGE for p in scanner)
+        high = tuple(p + RANGE for p in scanner)
+        for _ in range(beacons_per_scanner):
+            beacons.add(random_position(rng, low, high))
+        if len(scanners) > 1:
+            low = tuple(max(l, p - RANGE) for l, p in zip(low, parent))
+            high = tuple(min(h, p + RANGE) for h, p in zip(high, parent))
+            shared = sum(in_range(scanner, b) and in_range(parent, b) for b in beacons)
+            while shared < MIN_SHARED:
+                beacon = random_position(rng, low, high)
+                if beacon not in beacons:
+                    beacons.add(beacon)
+                    shared += 1
+    return scanners, sorted(beacons)
+
+
+def make_reports(scanners, beacons, seed=None):
+    """Returns for every scanner the list of beacons within its range, relative
+    to the scanner and in a random orientation."""
+    rng = Random(seed)
+    reports = []
+    for scanner in scanners:
+        axes, signs = rng.choice(ORIENTATIONS)
+        report = []
+        for beacon in beacons:
+            if in_range(scanner, beacon):
+                relative = [b - s for b, s in zip(beacon, scanner)]
+                report.append(tuple(sign * relative[axis] for axis, sign in zip(axes, signs)))
+        rng.shuffle(report)
+        reports.append(report)
+    return reports
+
+
+def get_expected_results(scanners, beacons):
+    """Returns the number of beacons that are seen by at least one scanner,
+    and the maximum Manhattan distance between two scanners."""
+    seen = sum(any(in_range(scanner, beacon) for scanner in scanners) for beacon in beacons)
+    max_distance = max(
+        (sum(abs(p1 - p2) for p1, p2 in zip(a, b)) for a, b in combinations(scanners, 2)),
+        default=0
+    )
+    return seen, max_distance
+
+
+def format_reports(reports):
+    lines = []
+    for index, report in enumerate(reports):
+        lines.append(f"--- scanner {index} ---")
+        lines.extend(",".join(map(str, beacon)) for beacon in report)
+        lines.append("")
+    return lines
+
+
+def generate_scanners(count, beacons_per_scanner=25, spacing=RANGE, seed=None):
+    """Returns a tuple of (report lines, expected number of beacons, expected
+    maximum scanner distance) for a random field of count scanners."""
+    scanners, beacons = generate_field(count, beacons_per_scanner, spacing, seed)
+    reports = make_reports(scanners, beacons, seed)
+    return (format_reports(reports), *get_expected_results(scanners, beacons))
+
+
+if __name__ == "__main__":
+    if not 2 <= len(argv) <= 5:
+        print(f"Usage: {argv[0]} <number of scanners> [<beacons per scanner>] [<spacing>] [<seed>]")
+        exit(1)
+    count = int(argv[1])
+    beacons_per_scanner = int(argv[2]) if len(argv) > 2 else 25
+    spacing = int(argv[3]) if len(argv) > 3 else RANGE
+    seed = int(argv[4]) if len(argv) > 4 else None
+    lines, beacon_count, max_distance = generate_scanners(
+        count, beacons_per_scanner, spacing, seed)
+    print("\n".join(lines))
+    print(f"Number of beacons: {beacon_count}", file=stderr)
+    print(f"Maximum sensor distance: {max_distance}", file=stderr)
@@ -0,0 +1,512 @@
+#!/bin/env python3
+#
+# Scanners and Beacons, and the alignment of the Scanners into a single
+# coordinate system (see 'strategy.txt').
+#
+# The original alignment, which matches a pair of Scanners one rotation
+# at a time, is kept at the bottom of this file. It is used as the reference
+# for benchmarking and cross-checking.
+
+import re
+import numpy as np
+from sys import exit, stderr
+from time import perf_counter
+from itertools import combinations
+from collections import Counter, defaultdict
+from heapq import heappop, heappush
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+
+
+def load_scanners(path):
+    with open(path, "r") as f:
+        return parse_scanners(f)
+
+
+def parse_scanners(lines):
+    scanners = []
+    for line in lines:
+        if "scanner" in line:
+            groups = re.match("-+\s+(scanner \d+)\s+-+", line)
+            scanner = Scanner(groups[1])
+            scanners.append(scanner)
+        elif "," in line:
+            pos = tuple(map(int, line.strip().split(",")))
+            beacon = Beacon(pos)
+            scanner.add_beacon(beacon)
+    for scanner in scanners:
+        scanner.create_coordinates()
+        scanner.create_fingerprints()
+    return scanners
+
+
+class Beacon:
+    """Implements a Beacon that can be contained by a Scanner."""
+
+    def __init__(self, pos):
+        self.orig_pos = pos
+        self.pos = pos
+        self.fingerprint = None
+
+    def set_fingerprint(self, fingerprint):
+        """Sets the fingerprint for this Beacon. The fingerprint is used for
+        comparing this Beacon against Beacons of other Scanners, without
+        having to know the relative positions of the two Scanners.
+        The actual creation of the fingerprint is handled by the containing
+        Scanner, because this depends on the surrounding Beacons that the
+        Scanner knows about."""
+        self.fingerprint = fingerprint
+
+    def __eq__(self, other):
+        """Returns True when this Beacon has the same coordinates as the other Beacon."""
+        return self.pos == other.pos
+
+
+class Scanner:
+    """Implement a Scanner that contains a set of Beacons."""
+
+    def __init__(self, name):
+        self.pos = (0, 0, 0)
+        self.transformation = None
+        self.name = name
+        self.beacons = []
+        self.fingerprints = None
+        self.fingerprint_index = None
+        self.orig_coords = None
+        self.coords = None
+
+    def add_beacon(self, beacon):
+        self.beacons.append(beacon)
+
+    def __str__(self):
+        return f"<{self.name}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def create_coordinates(self):
+        """Creates an (n,3) array of the coordinates of all contained Beacons,
+        as used for matching the Beacons of two Scanners in one go."""
+        if self.beacons:
+            self.orig_coords = np.array([beacon.orig_pos for beacon in self.beacons])
+        else:
+            self.orig_coords = np.empty((0, 3), dtype=int)
+        self.coords = self.orig_coords
+
+    def create_fingerprints(self):
+        """Creates fingerprints for all contained Beacons, and an index that
+        maps each fingerprint to the positions of its Beacons in the list."""
+        self.fingerprint_index = defaultdict(list)
+        for index, fingerprint in enumerate(self.create_beacon_fingerprints()):
+            self.beacons[index].set_fingerprint(fingerprint)
+            self.fingerprint_index[fingerprint].append(index)
+        self.fingerprints = set(self.fingerprint_index)
+
+    def create_beacon_fingerprints(self):
+        """Creates orientation-agnostic fingerprints for all Beacons, based on
+        the two Beacons that are closest to each Beacon. Instead of sorting all
+        Beacons by distance for every Beacon, the distance matrix is computed
+        in one go and only its three smallest values per row are selected.
+        The Beacon index is added to the sort key, so ties are resolved the
+        same way as a stable sort would. A Scanner with less than three Beacons
+        gets no fingerprints."""
+        coords = self.orig_coords
+        n = len(coords)
+        if n < 3:
+            return []
+        deltas = coords[:, None, :] - coords[None, :, :]
+        keys = (deltas ** 2).sum(axis=2) * n + np.arange(n)
+        nearest = np.argpartition(keys, 2, axis=1)[:, :3]
+        order = np.take_along_axis(keys, nearest, axis=1).argsort(axis=1)
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        d1 = np.sort(np.abs(coords[nearest[:, 1]] - coords), axis=1)
+        d2 = np.sort(np.abs(coords[nearest[:, 2]] - coords), axis=1)
+        return [
+            (tuple(f1), tuple(f2)) for f1, f2 in zip(d1.tolist(), d2.tolist())
+        ]
+
+    def pairs_for_fingerprints(self, other, fingerprints):
+        """Looks up the pairs of Beacons of this Scanner and the other Scanner
+        that have the same fingerprint, for the given fingerprints. Returns a
+        tuple of two lists, containing the list positions of the paired Beacons
+        for this Scanner and for the other Scanner."""
+        pairs = [
+            (index, other_index)
+            for fingerprint in fingerprints
+            for index in self.fingerprint_index.get(fingerprint, [])
+            for other_index in other.fingerprint_index.get(fingerprint, [])
+        ]
+        return [index for index, _ in pairs], [index for _, index in pairs]
+
+    def transform(self, transformation):
+        """Transform the coordinates for this Scanner and for all Beacons contained
+        by this Scanner, by applying the transformation to the original coordinates.
+        This is done only once per Scanner, after its transformation is final."""
+        self.transformation = transformation
+        self.coords = transformation.apply(self.orig_coords)
+        self.pos = transformation.shift
+        for beacon, coords in zip(self.beacons, self.coords.tolist()):
+            beacon.pos = tuple(coords)
+
+
+def get_reorientation_transformations():
+    """Returns a list of functions that can be used to rotate 3D coordinates
+    into any possible direction. See the file 'strategy.txt' for information on
+    how I got to this piece of code."""
+    return [
+        lambda pos: (+pos[0], +pos[1], +pos[2]),
+        lambda pos: (-pos[1], +pos[0], +pos[2]),
+        lambda pos: (-pos[0], -pos[1], +pos[2]),
+        lambda pos: (+pos[1], -pos[0], +pos[2]),
+        lambda pos: (-pos[2], +pos[1], +pos[0]),
+        lambda pos: (-pos[1], -pos[2], +pos[0]),
+        lambda pos: (+pos[2], -pos[1], +pos[0]),
+        lambda pos: (+pos[1], +pos[2], +pos[0]),
+        lambda pos: (+pos[2], +pos[1], -pos[0]),
+        lambda pos: (-pos[1], +pos[2], -pos[0]),
+        lambda pos: (-pos[2], -pos[1], -pos[0]),
+        lambda pos: (+pos[1], -pos[2], -pos[0]),
+        lambda pos: (+pos[0], -pos[2], +pos[1]),
+        lambda pos: (+pos[2], +pos[0], +pos[1]),
+        lambda pos: (-pos[0], +pos[2], +pos[1]),
+        lambda pos: (-pos[2], -pos[0], +pos[1]),
+        lambda pos: (+pos[0], +pos[2], -pos[1]),
+        lambda pos: (-pos[2], +pos[0], -pos[1]),
+        lambda pos: (-pos[0], -pos[2], -pos[1]),
+        lambda pos: (+pos[2], -pos[0], -pos[1]),
+        lambda pos: (-pos[0], +pos[1], -pos[2]),
+        lambda pos: (-pos[1], -pos[0], -pos[2]),
+        lambda pos: (+pos[0], -pos[1], -pos[2]),
+        lambda pos: (+pos[1], +pos[0], -pos[2]),
+    ]
+
+
+def get_rotation_matrices():
+    """Returns the reorientation transformations as an array of 24 rotation
+    matrices. Column i of a matrix is where the transformation moves the
+    unit vector for axis i to."""
+    unit_vectors = np.eye(3, dtype=int)
+    return np.array([
+        np.array([transform(v) for v in unit_vectors]).T
+        for transform in get_reorientation_transformations()
+    ])
+
+
+ROTATIONS = get_rotation_matrices()
+
+
+def get_rotation_index(rotation):
+    """Returns the index of the provided rotation matrix in ROTATIONS."""
+    return next(i for i, r in enumerate(ROTATIONS) if (r == rotation).all())
+
+
+# Rotations combined are rotations as well, so these can be looked up by index:
+# ROTATION_PRODUCTS[i][j] is the rotation that first applies j, then i.
+ROTATION_PRODUCTS = [
+    [get_rotation_index(r1 @ r2) for r2 in ROTATIONS] for r1 in ROTATIONS
+]
+INVERSE_ROTATIONS = [get_rotation_index(rotation.T) for rotation in ROTATIONS]
+
+
+class Transformation:
+    """Implements an immutable transformation of coordinates, consisting of a
+    rotation (an index into ROTATIONS) followed by a shift. Transformations are
+    composed without touching any coordinates; those are only transformed when
+    the transformation is applied to them."""
+
+    def __init__(self, rotation=0, shift=(0, 0, 0)):
+        self._rotation = rotation
+        self._shift = tuple(int(p) for p in shift)
+
+    @property
+    def rotation(self):
+        return self._rotation
+
+    @property
+    def shift(self):
+        return self._shift
+
+    def apply(self, coords):
+        """Applies this transformation to an (n,3) array of coordinates."""
+        return coords @ ROTATIONS[self._rotation].T + self._shift
+
+    def then(self, other):
+        """Returns the transformation that first applies this transformation,
+        and then the other one."""
+        rotation = ROTATION_PRODUCTS[other._rotation][self._rotation]
+        shift = ROTATIONS[other._rotation] @ self._shift + other._shift
+        return Transformation(rotation, shift)
+
+    def inverse(self):
+        """Returns the transformation that undoes this transformation."""
+        rotation = INVERSE_ROTATIONS[self._rotation]
+        return Transformation(rotation, -(ROTATIONS[rotation] @ self._shift))
+
+    def __eq__(self, other):
+        return (self._rotation, self._shift) == (other._rotation, other._shift)
+
+    def __hash__(self):
+        return hash((self._rotation, self._shift))
+
+    def __repr__(self):
+        return f"<Transformation rotation={self._rotation} shift={self._shift}>"
+
+
+# Shift vectors and coordinates are packed into a single int64 (21 bits per
+# axis), which makes comparing and counting them a lot faster than comparing rows.
+SHIFT_BITS = 21
+SHIFT_OFFSET = 1 << (SHIFT_BITS - 1)
+
+# The number of Beacons that two Scanners must have in common to be aligned.
+MIN_MATCHING_BEACONS = 12
+
+
+def pack_shifts(shifts):
+    shifts = shifts.astype(np.int64) + SHIFT_OFFSET
+    return (shifts[..., 0] << (2 * SHIFT_BITS)) | (shifts[..., 1] << SHIFT_BITS) | shifts[..., 2]
+
+
+def count_matching_beacons(a_coords, b_keys, rotation, shift):
+    """Returns the number of Beacon coordinates a that end up at one of the
+    (packed) Beacon coordinates b, after applying the rotation and shift."""
+    moved = a_coords @ ROTATIONS[rotation].T + shift
+    return int(np.isin(pack_shifts(moved), b_keys).sum())
+
+
+def align(scanners, workers=None, verbose=True):
+    """Align the provided list of Scanners. This will transform the coordinates
+    of the Scanners and their Beacons in such way, that the Beacons that are seen
+    by two or more Scanners end up at the same coordinates.
+
+    The alignment grows breadth-first from the start Scanner. Every Scanner
+    that is not aligned yet keeps a heap of its untried edges to aligned
+    Scanners, most fingerprint overlaps first. In every round, the best edge
+    of every Scanner on the frontier is matched (see match_frontier). Composing
+    the relative transformation of a successful match with the one of the
+    aligned Scanner, brings the next Scanner into the coordinate system of the
+    start Scanner, after which its own edges are added to the frontier. This
+    stops as soon as all Scanners are aligned, so most pairs are never matched.
+    The coordinates of the Scanners and their Beacons are only transformed at
+    the end, once all transformations are known."""
+    possible_alignments = make_alignment_candidates(scanners)
+    start = pick_start_scanner(possible_alignments)
+    edges = defaultdict(list)
+    for index, (overlap, a, b) in enumerate(possible_alignments):
+        if overlap:
+            edges[a].append((overlap, index, b))
+            edges[b].append((overlap, index, a))
+
+    transformations = {}
+    frontier = defaultdict(list)
+
+    def add_aligned(scanner, transformation):
+        transformations[scanner] = transformation
+        frontier.pop(scanner, None)
+        for overlap, index, other in edges[scanner]:
+            if other not in transformations:
+                heappush(frontier[other], (-len(overlap), index, scanner, overlap))
+
+    add_aligned(start, Transformation())
+    workers = workers or cpu_count()
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        while len(transformations) < len(scanners):
+            batch = [
+                (a, heappop(heap)[2:])
+                for a, heap in frontier.items() if heap
+            ]
+            if not batch:
+                break
+            pairs = [(a, b, overlap) for a, (b, overlap) in batch]
+            for (a, b, _), (match, elapsed) in zip(pairs, match_frontier(pairs, executor, workers)):
+                if match is None:
+                    continue
+                rotation, shift, matching = match
+                relative = Transformation(rotation, shift)
+                add_aligned(a, relative.then(transformations[b]))
+                if verbose:
+                    print(
+                        f"Aligned {a} via {b} ({matching} beacons, matched in {elapsed * 1000:.2f}ms)",
+                        file=stderr)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    unaligned = set(scanners) - set(transformations)
+    if unaligned:
+        print("Alignment failed for scanner(s):")
+        print("> " + "\n> ".join(map(str, unaligned)))
+        exit(1)
+    for scanner, transformation in transformations.items():
+        scanner.transform(transformation)
+
+
+def make_alignment_candidates(scanners):
+    """Returns pairs of Scanners, ordered by the likeliness that they can be
+    aligned with each other. The is determined by checking how many fingerprint
+    overlaps can be found between the two related sets of Beacons."""
+
+    def matching_fingerprints(pair):
+        a, b = pair
+        return (a.fingerprints & b.fingerprints, a, b)
+
+    def by_number_of_overlaps(pair):
+        matching, a, b = pair
+        return len(matching)
+
+    combis = combinations(scanners, 2)
+    pairs = map(matching_fingerprints, combis)
+    pairs = sorted(pairs, key=by_number_of_overlaps, reverse=True)
+    return pairs
+
+
+def pick_start_scanner(possible_alignments):
+    """Pick the Scanner that looks like it might have the most neighbours as the
+    starting point for alignment. Being the starting point means that the coordinate
+    system for start Beacon will be fixated, serving as the reference coordinate
+    system that all other Sensors must be aligned to."""
+    connections = Counter()
+    for overlap, a, b in possible_alignments:
+        l = len(overlap)
+        connections.update({a: l, b: l})
+    start, _ = connections.most_common()[0]
+    return start
+
+
+def match_frontier(pairs, executor=None, workers=1):
+    """Matches a batch of (a, b, overlap) Scanner pairs, where Scanner a is to
+    be brought into the coordinate system of Scanner b. The pairs are
+    independent of each other, so when an executor is provided, they are
+    matched in parallel by its worker processes.
+
+    Returns a list with the result of match_pair() for every pair."""
+    payloads = [make_match_payload(overlap, a, b) for a, b, overlap in pairs]
+    if executor is None:
+        return list(map(match_pair, payloads))
+    chunksize = max(1, len(payloads) // (workers * 4))
+    return list(executor.map(match_pair, payloads, chunksize=chunksize))
+
+
+def make_match_payload(overlap, a, b):
+    """Returns the arguments for find_relative_transformation() for matching
+    Scanner a with Scanner b: the coordinates of every pair of Beacons that
+    have the same fingerprint, and the coordinates of all Beacons."""
+    a_indexes, b_indexes = a.pairs_for_fingerprints(b, overlap)
+    return (
+        a.orig_coords[a_indexes], b.orig_coords[b_indexes],
+        a.orig_coords, b.orig_coords,
+    )
+
+
+def match_pair(payload):
+    """Matches the Beacon coordinates of two Scanners. Returns a tuple of
+    (match, matching time in seconds), where match is the result of
+    find_relative_transformation()."""
+    started = perf_counter()
+    match = find_relative_transformation(*payload)
+    return match, perf_counter() - started
+
+
+def find_relative_transformation(a_pairs, b_pairs, a_coords, b_coords):
+    """Find the rotation and shift that bring Beacon coordinates a into the
+    coordinate system of Beacon coordinates b. Returns a tuple of (rotation index,
+    shift, number of matching Beacons), or None when they cannot be aligned.
+
+    The candidates are found using the pairs of Beacons with the same fingerprint
+    (a_pairs[i] and b_pairs[i]). With the right rotation, the pairs that really
+    are the same Beacon all agree on the shift between the two Scanners, while
+    with a wrong rotation the shifts of the pairs (almost) never agree. The shifts
+    of all pairs are computed for all 24 rotations in one broadcast. Rotations
+    for which no two pairs agree are rejected right away. The other ones are
+    checked against all Beacon coordinates, most agreeing pairs first."""
+    if len(a_pairs) < 2:
+        return None
+    shifts = b_pairs - a_pairs @ ROTATIONS.transpose(0, 2, 1)
+    keys = np.sort(pack_shifts(shifts), axis=1)
+    candidates = []
+    for rotation in np.flatnonzero((keys[:, 1:] == keys[:, :-1]).any(axis=1)):
+        unique, counts = np.unique(keys[rotation], return_counts=True)
+        for key, count in zip(unique[counts > 1], counts[counts > 1]):
+            candidates.append((count, rotation, key))
+    if not candidates:
+        return None
+
+    b_keys = pack_shifts(b_coords)
+    for _, rotation, key in sorted(candidates, reverse=True):
+        index = np.flatnonzero(pack_shifts(shifts[rotation]) == key)[0]
+        shift = shifts[rotation, index]
+        count = count_matching_beacons(a_coords, b_keys, rotation, shift)
+        if count >= MIN_MATCHING_BEACONS:
+            return int(rotation), shift, count
+    return None
+
+
+def get_unique_beacons(scanners):
+    unique_beacons = set()
+    for scanner in scanners:
+        unique_beacons.update(beacon.pos for beacon in scanner.beacons)
+    return unique_beacons
+
+
+def get_max_scanner_distance(scanners):
+    def taxi_distance(pair):
+        a, b = pair
+        return sum(abs(p1 - p2) for p1, p2 in zip(a.pos, b.pos))
+
+    return max(map(taxi_distance, combinations(scanners, 2)))
+
+
+# Reference implementation: the original alignment, which tries the pairs of
+# Scanners in order of their fingerprint overlap, and matches a pair one
+# rotation at a time, using a Counter of the shifts of the Beacon pairs with
+# the same fingerprint.
+
+
+def align_reference(scanners):
+    """Determines the Transformation for every Scanner like the original
+    alignment, without transforming any coordinates. After every aligned
+    Scanner, the pairs are tried from the start again. Returns a dict that maps
+    the Scanners that could be aligned to their Transformation."""
+    possible_alignments = make_alignment_candidates(scanners)
+    start = pick_start_scanner(possible_alignments)
+    transformations = {start: Transformation()}
+    aligned = True
+    while aligned:
+        aligned = False
+        for overlap, a, b in possible_alignments:
+            if a in transformations:
+                a, b = b, a
+            if a in transformations or b not in transformations:
+                continue
+            relative = find_relative_transformation_reference(overlap, a, b)
+            if relative is not None:
+                transformations[a] = relative.then(transformations[b])
+                aligned = True
+                break
+    return transformations
+
+
+def find_relative_transformation_reference(overlap, a, b):
+    """Like the original, all Beacons of Scanner a are reoriented for every
+    rotation, and the Beacons for a fingerprint are looked up by scanning
+    the Beacons of the Scanners."""
+    for rotation, reorient in enumerate(get_reorientation_transformations()):
+        positions = [reorient(beacon.orig_pos) for beacon in a.beacons]
+        shifts = Counter()
+        for fingerprint in overlap:
+            for index, ba in enumerate(a.beacons):
+                if ba.fingerprint != fingerprint:
+                    continue
+                for bb in b.beacons:
+                    if bb.fingerprint == fingerprint:
+                        shifts.update([tuple(pb - pa for pa, pb in zip(positions[index], bb.orig_pos))])
+                if len(shifts) > 1:
+                    break
+            if len(shifts) > 1:
+                break
+        else:
+            if shifts:
+                shift, count = shifts.popitem()
+                if count >= MIN_MATCHING_BEACONS:
+                    return Transformation(rotation, shift)
+    return None
@@ -0,0 +1,185 @@
+#!/bin/env python3
+#
+# This script contains unit tests for the scanners module.
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from random import Random
+from scanners import *
+from scanner_generator import generate_field, make_reports, format_reports, get_expected_results
+
+
+def random_transformation(rng):
+    shift = [rng.randint(-2000, 2000) for _ in range(3)]
+    return Transformation(rng.randrange(len(ROTATIONS)), shift)
+
+
+def generate_scanner_lines(count, spacing, seed):
+    """Returns a tuple of (report lines, scanner positions, beacon positions)
+    for a generated field."""
+    positions, beacons = generate_field(count, spacing=spacing, seed=seed)
+    return format_reports(make_reports(positions, beacons, seed)), positions, beacons
+
+
+class TestRotations(unittest.TestCase):
+    def test_rotations_are_distinct_proper_rotations(self):
+        self.assertEqual(24, len(ROTATIONS))
+        self.assertEqual(24, len({rotation.tobytes() for rotation in ROTATIONS}))
+        for rotation in ROTATIONS:
+            self.assertEqual(1, round(np.linalg.det(rotation)))
+
+    def test_products(self):
+        for i, r1 in enumerate(ROTATIONS):
+            for j, r2 in enumerate(ROTATIONS):
+                product = ROTATIONS[ROTATION_PRODUCTS[i][j]]
+                self.assertTrue((r1 @ r2 == product).all(), f"{i} x {j}")
+
+    def test_inverses(self):
+        identity = np.identity(3, dtype=int)
+        self.assertTrue((ROTATIONS[0] == identity).all())
+        for i, rotation in enumerate(ROTATIONS):
+            inverse = INVERSE_ROTATIONS[i]
+            self.assertTrue((ROTATIONS[inverse] @ rotation == identity).all(), i)
+            self.assertEqual(0, ROTATION_PRODUCTS[i][inverse])
+
+    def test_reorientation_transformations_match_rotations(self):
+        pos = (1, 2, 3)
+        for rotation, reorient in enumerate(get_reorientation_transformations()):
+            self.assertEqual(tuple(ROTATIONS[rotation] @ pos), tuple(reorient(pos)))
+
+
+class TestTransformation(unittest.TestCase):
+    def test_then_inverse_is_identity(self):
+        rng = Random(19)
+        for _ in range(100):
+            transformation = random_transformation(rng)
+            self.assertEqual(Transformation(), transformation.then(transformation.inverse()))
+            self.assertEqual(Transformation(), transformation.inverse().then(transformation))
+
+    def test_then_applies_both_transformations(self):
+        rng = Random(20)
+        coords = np.array([[rng.randint(-1000, 1000) for _ in range(3)] for _ in range(10)])
+        for _ in range(100):
+            first = random_transformation(rng)
+            second = random_transformation(rng)
+            expected = second.apply(first.apply(coords))
+            self.assertTrue((expected == first.then(second).apply(coords)).all())
+
+    def test_inverse_restores_coordinates(self):
+        rng = Random(21)
+        coords = np.array([[rng.randint(-1000, 1000) for _ in range(3)] for _ in range(10)])
+        for _ in range(100):
+            transformation = random_transformation(rng)
+            moved = transformation.apply(coords)
+            self.assertTrue((coords == transformation.inverse().apply(moved)).all())
+
+
+class TestParser(unittest.TestCase):
+    def test_scanners_with_few_beacons(self):
+        scanners = parse_scanners([
+            "--- scanner 0 ---\n", "\n",
+            "--- scanner 1 ---\n", "1,2,3\n", "-4,5,-6\n", "\n",
+            "--- scanner 2 ---\n", "1,2,3\n", "-4,5,-6\n", "7,8,9\n",
+        ])
+        self.assertEqual(["scanner 0", "scanner 1", "scanner 2"], [s.name for s in scanners])
+        self.assertEqual([(0, 3), (2, 3), (3, 3)], [s.orig_coords.shape for s in scanners])
+        self.assertEqual([0, 0, 3], [len(s.fingerprints) for s in scanners])
+
+    def test_fingerprints_ignore_orientation_and_position(self):
+        scanner = load_scanners("example.txt")[0]
+        transformation = Transformation(17, (100, -200, 300))
+        lines = ["--- scanner 0 ---"] + [
+            ",".join(map(str, coords))
+            for coords in transformation.apply(scanner.orig_coords).tolist()
+        ]
+        moved = parse_scanners(lines)[0]
+        self.assertEqual(
+            [beacon.fingerprint for beacon in scanner.beacons],
+            [beacon.fingerprint for beacon in moved.beacons])
+
+
+class TestRelativeTransformation(unittest.TestCase):
+    def match(self, a, b):
+        overlap = a.fingerprints & b.fingerprints
+        return find_relative_transformation(*make_match_payload(overlap, a, b))
+
+    def test_finds_transformation_of_moved_scanner(self):
+        scanner = load_scanners("example.txt")[1]
+        rng = Random(22)
+        for _ in range(10):
+            transformation = random_transformation(rng)
+            lines = ["--- scanner 1 ---"] + [
+                ",".join(map(str, coords))
+                for coords in transformation.apply(scanner.orig_coords).tolist()
+            ]
+            moved = parse_scanners(lines)[0]
+            rotation, shift, count = self.match(scanner, moved)
+            self.assertEqual(transformation, Transformation(rotation, shift))
+            self.assertEqual(len(scanner.beacons), count)
+
+    def test_example_scanners(self):
+        scanners = load_scanners("example.txt")
+        rotation, shift, count = self.match(scanners[1], scanners[0])
+        self.assertEqual((68, -1246, -43), Transformation(rotation, shift).shift)
+        self.assertEqual(12, count)
+
+    def test_scanners_without_shared_beacons(self):
+        scanners = load_scanners("example.txt")
+        self.assertIsNone(self.match(scanners[0], scanners[2]))
+
+    def test_too_few_pairs(self):
+        coords = np.array([[1, 2, 3]])
+        self.assertIsNone(find_relative_transformation(coords, coords, coords, coords))
+
+
+class TestAlign(unittest.TestCase):
+    def test_example(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                scanners = load_scanners("example.txt")
+                align(scanners, workers, verbose=False)
+                self.assertEqual(79, len(get_unique_beacons(scanners)))
+                self.assertEqual(3621, get_max_scanner_distance(scanners))
+
+    def test_generated_field_matches_ground_truth(self):
+        for spacing, seed in [(1000, 1), (400, 2), (300, 3)]:
+            with self.subTest(spacing=spacing, seed=seed):
+                lines, positions, beacons = generate_scanner_lines(30, spacing, seed)
+                scanners = parse_scanners(lines)
+                align(scanners, 1, verbose=False)
+                expected_beacons, expected_distance = get_expected_results(positions, beacons)
+                self.assertEqual(expected_beacons, len(get_unique_beacons(scanners)))
+                self.assertEqual(expected_distance, get_max_scanner_distance(scanners))
+
+                # All scanners must be placed in the coordinate system of the
+                # first scanner by one and the same rotation.
+                truth = np.array(positions) - positions[0]
+                found = np.array([scanner.pos for scanner in scanners]) - scanners[0].pos
+                self.assertTrue(any(
+                    (truth @ rotation.T == found).all() for rotation in ROTATIONS))
+
+    def test_reference_agrees(self):
+        lines, _, _ = generate_scanner_lines(20, 400, 4)
+        scanners = parse_scanners(lines)
+        expected = align_reference(parse_scanners(lines))
+        align(scanners, 1, verbose=False)
+        start = next(scanner for scanner in scanners if scanner.transformation == Transformation())
+        reference_start = next(s for s in expected if s.name == start.name)
+        to_start = expected[reference_start].inverse()
+        for scanner, transformation in expected.items():
+            with self.subTest(scanner=scanner.name):
+                aligned = next(s for s in scanners if s.name == scanner.name)
+                self.assertEqual(aligned.transformation, transformation.then(to_start))
+
+    def test_exits_when_scanners_cannot_be_aligned(self):
+        with open("example.txt", "r") as f:
+            lines = f.readlines()
+        scanners = parse_scanners(lines + ["\n", "--- scanner 5 ---\n", "1,1,1\n"])
+        output = io.StringIO()
+        with self.assertRaises(SystemExit), redirect_stdout(output):
+            align(scanners, 1, verbose=False)
+        self.assertIn("Alignment failed for scanner(s):\n> <scanner 5>", output.getvalue())
+
+
+unittest.main()
@@ -0,0 +1,46 @@
+#!/bin/env python3
+#
+# This script benchmarks the reactor engines from reactor.py on randomly
+# generated reboot steps (see reboot_generator.py). For every engine, the
+# number of entries it ends up with is reported as well.
+#
+# Usage: benchmark.py [<number of steps>] [<prefix steps>] [<max size>] [<seed>]
+#
+# The grid of the VoxelReactor grows cubically with the number of steps.
+# Therefore, all engines first execute only the first <prefix steps> steps,
+# and are checked to agree on the number of lit cubes for those. After that,
+# the other engines execute all steps. This includes the ListReactor, whose
+# cost grows quadratically with the number of cuboids, as the baseline for
+# the other engines.
+
+from sys import argv, exit
+from time import perf_counter
+from reactor import *
+from reboot_generator import generate_reboot_steps
+
+
+def benchmark(name, steps):
+    started = perf_counter()
+    reactor = boot_up_reactor(steps, ENGINES[name]())
+    lit_cubes = reactor.count_lit_cubes()
+    elapsed = perf_counter() - started
+    print(f"{name:10s} {len(steps):8d} {len(reactor):10d} {elapsed:9.3f}s {lit_cubes:20d}")
+    return lit_cubes
+
+
+PREFIX_ONLY_ENGINES = ("voxel",)
+
+count = int(argv[1]) if len(argv) > 1 else 10000
+prefix_count = int(argv[2]) if len(argv) > 2 else 500
+max_size = int(argv[3]) if len(argv) > 3 else 50000
+seed = int(argv[4]) if len(argv) > 4 else 2021
+
+steps = generate_reboot_steps(count, max_size, seed)
+print(f"{'engine':10s} {'steps':>8s} {'entries':>10s} {'time':>10s} {'lit cubes':>20s}")
+results = {benchmark(name, steps[:prefix_count]) for name in ENGINES}
+if len(results) != 1:
+    print("The engines do not agree on the number of lit cubes!")
+    exit(1)
+for name in ENGINES:
+    if name not in PREFIX_ONLY_ENGINES:
+        benchmark(name, steps)
@@ -0,0 +1,338 @@
+#!/bin/env python3
+#
+# Engines for executing reactor reboot steps. A step is a tuple of
+# (turn_on, corner1, corner2), in which the corners are inclusive (x, y, z)
+# coordinates. The engines implement the strategy from 'strategy.txt': lit
+# cubes are stored as disjoint cuboids, and an existing cuboid that is
+# overlapped by a step is split into pieces, dropping the overlapped part.
+#
+# ListReactor scans all cuboids for overlaps on every step. IndexedReactor
+# keeps the cuboids in a CuboidIndex, so only cuboids near the step are
+# looked at. SignedReactor takes a different approach: it keeps a Counter
+# of signed, possibly overlapping cuboids (see its docstring). VoxelReactor
+# does not work with cuboids at all, but with a compressed grid of cells.
+
+import re
+from collections import Counter
+from itertools import product
+
+STEP_SYNTAX = re.compile(
+    r"(on|off) x=(-?\d+)\.\.(-?\d+),y=(-?\d+)\.\.(-?\d+),z=(-?\d+)\.\.(-?\d+)"
+)
+
+
+def parse_reboot_steps(lines):
+    """Parses the reboot steps. Lines that are not valid steps are reported
+    and skipped."""
+    steps = []
+    for line in lines:
+        if m := STEP_SYNTAX.match(line):
+            turn_on = m[1] == "on"
+            corner1 = (int(m[2]), int(m[4]), int(m[6]))
+            corner2 = (int(m[3]), int(m[5]), int(m[7]))
+            steps.append((turn_on, corner1, corner2))
+        else:
+            print(f"Syntax error in: {line.rstrip()}")
+    return steps
+
+
+def load_reboot_steps(path):
+    with open(path, "r") as f:
+        return parse_reboot_steps(f)
+
+
+def clip_reboot_steps(steps, low=-50, high=50):
+    """Clips the steps to the region from low to high along all axes.
+    Steps that fall completely outside the region are dropped."""
+    clipped = []
+    for turn_on, corner1, corner2 in steps:
+        corner1 = tuple(max(low, c) for c in corner1)
+        corner2 = tuple(min(high, c) for c in corner2)
+        if all(c1 <= c2 for c1, c2 in zip(corner1, corner2)):
+            clipped.append((turn_on, corner1, corner2))
+    return clipped
+
+
+def overlapping(a, b):
+    (ax1, ay1, az1), (ax2, ay2, az2) = a
+    (bx1, by1, bz1), (bx2, by2, bz2) = b
+    if bx2 < ax1 or by2 < ay1 or bz2 < az1:
+        return False
+    if ax2 < bx1 or ay2 < by1 or az2 < bz1:
+        return False
+    return True
+
+
+def split_overlapped(overlapped, cuboid):
+    """Yields the pieces of the overlapped cuboid that are not covered
+    by the other cuboid (at most six)."""
+    (ox1, oy1, oz1), (ox2, oy2, oz2) = overlapped
+    (sx1, sy1, sz1), (sx2, sy2, sz2) = cuboid
+    if ox1 < sx1 <= ox2:
+        yield (ox1, oy1, oz1), (sx1 - 1, oy2, oz2)
+        ox1 = sx1
+    if oy1 < sy1 <= oy2:
+        yield (ox1, oy1, oz1), (ox2, sy1 - 1, oz2)
+        oy1 = sy1
+    if oz1 < sz1 <= oz2:
+        yield (ox1, oy1, oz1), (ox2, oy2, sz1 - 1)
+        oz1 = sz1
+    if ox1 <= sx2 < ox2:
+        yield (sx2 + 1, oy1, oz1), (ox2, oy2, oz2)
+        ox2 = sx2
+    if oy1 <= sy2 < oy2:
+        yield (ox1, sy2 + 1, oz1), (ox2, oy2, oz2)
+        oy2 = sy2
+    if oz1 <= sz2 < oz2:
+        yield (ox1, oy1, sz2 + 1), (ox2, oy2, oz2)
+        oz2 = sz2
+
+
+def intersection(a, b):
+    """Returns the cuboid in which two cuboids overlap, or None when they
+    do not overlap."""
+    (ax1, ay1, az1), (ax2, ay2, az2) = a
+    (bx1, by1, bz1), (bx2, by2, bz2) = b
+    x1, y1, z1 = max(ax1, bx1), max(ay1, by1), max(az1, bz1)
+    x2, y2, z2 = min(ax2, bx2), min(ay2, by2), min(az2, bz2)
+    if x1 > x2 or y1 > y2 or z1 > z2:
+        return None
+    return (x1, y1, z1), (x2, y2, z2)
+
+
+def volume(cuboid):
+    (x1, y1, z1), (x2, y2, z2) = cuboid
+    return (x2 - x1 + 1) * (y2 - y1 + 1) * (z2 - z1 + 1)
+
+
+class ListReactor:
+    """Keeps the lit cuboids in a set, which is scanned for overlaps on every step."""
+
+    def __init__(self):
+        self.cuboids = set()
+
+    def apply(self, step):
+        turn_on, corner1, corner2 = step
+        cuboid = (corner1, corner2)
+        overlaps = [existing for existing in self.cuboids if overlapping(existing, cuboid)]
+        for overlapped in overlaps:
+            self.cuboids.remove(overlapped)
+            self.cuboids.update(split_overlapped(overlapped, cuboid))
+        if turn_on:
+            self.cuboids.add(cuboid)
+
+    def count_lit_cubes(self):
+        return sum(map(volume, self.cuboids))
+
+    def __len__(self):
+        return len(self.cuboids)
+
+
+class IndexedReactor:
+    """Keeps the lit cuboids in a CuboidIndex. The number of lit cubes is
+    updated on every change, so it does not have to be computed at the end."""
+
+    def __init__(self):
+        self.index = CuboidIndex()
+        self.lit_cubes = 0
+
+    def apply(self, step):
+        turn_on, corner1, corner2 = step
+        cuboid = (corner1, corner2)
+        for overlapped in self.index.query(cuboid):
+            self.index.remove(overlapped)
+            self.lit_cubes -= volume(overlapped)
+            for piece in split_overlapped(overlapped, cuboid):
+                self.index.add(piece)
+                self.lit_cubes += volume(piece)
+        if turn_on:
+            self.index.add(cuboid)
+            self.lit_cubes += volume(cuboid)
+
+    def count_lit_cubes(self):
+        return self.lit_cubes
+
+    def __len__(self):
+        return len(self.index)
+
+
+class CuboidIndex:
+    """A spatial index for cuboids, implemented as a hierarchical grid.
+
+    A cuboid is stored at the level at which the grid cells are larger than
+    its largest extent, in the cell that contains its first corner. Because of
+    that, a cuboid at level L only reaches into the next cell along each axis.
+    To find the cuboids that overlap a query cuboid, only the cells that the
+    query covers (widened by one cell) have to be checked at every level.
+    When a level has fewer occupied cells than that, its occupied cells are
+    checked instead. Adding and removing cuboids are dict and set operations,
+    which suits the constant splitting of cuboids into pieces."""
+
+    def __init__(self):
+        self.levels = {}
+        self.size = 0
+
+    @staticmethod
+    def locate(cuboid):
+        (x1, y1, z1), (x2, y2, z2) = cuboid
+        level = max(x2 - x1, y2 - y1, z2 - z1).bit_length()
+        return level, (x1 >> level, y1 >> level, z1 >> level)
+
+    def add(self, cuboid):
+        level, cell = self.locate(cuboid)
+        self.levels.setdefault(level, {}).setdefault(cell, set()).add(cuboid)
+        self.size += 1
+
+    def remove(self, cuboid):
+        level, cell = self.locate(cuboid)
+        cells = self.levels[level]
+        bucket = cells[cell]
+        bucket.remove(cuboid)
+        if not bucket:
+            del cells[cell]
+            if not cells:
+                del self.levels[level]
+        self.size -= 1
+
+    def query(self, cuboid):
+        """Returns a list of the stored cuboids that overlap the provided cuboid."""
+        (x1, y1, z1), (x2, y2, z2) = cuboid
+        found = []
+        for level, cells in self.levels.items():
+            lx, ly, lz = (x1 >> level) - 1, (y1 >> level) - 1, (z1 >> level) - 1
+            hx, hy, hz = x2 >> level, y2 >> level, z2 >> level
+            if (hx - lx + 1) * (hy - ly + 1) * (hz - lz + 1) <= len(cells):
+                buckets = (
+                    cells[cell]
+                    for cell in product(range(lx, hx + 1), range(ly, hy + 1), range(lz, hz + 1))
+                    if cell in cells
+                )
+            else:
+                buckets = (
+                    bucket for (cx, cy, cz), bucket in cells.items()
+                    if lx <= cx <= hx and ly <= cy <= hy and lz <= cz <= hz
+                )
+            for bucket in buckets:
+                for other in bucket:
+                    (ox1, oy1, oz1), (ox2, oy2, oz2) = other
+                    if ox1 <= x2 and x1 <= ox2 and oy1 <= y2 and y1 <= oy2 and oz1 <= z2 and z1 <= oz2:
+                        found.append(other)
+        return found
+
+    def __len__(self):
+        return self.size
+
+
+class SignedReactor:
+    """Uses inclusion-exclusion instead of splitting cuboids. The reactor is
+    a Counter of cuboids, in which the count is the sign with which the
+    volume of a cuboid must be counted (possibly multiple times).
+    For every step, the intersection with each existing cuboid is counted
+    with the opposite sign, which cancels out the volume that the step
+    covers. For "on" steps, the cuboid of the step is added on top of that.
+    Entries that cancel out completely are dropped. The cuboids are also
+    kept in a CuboidIndex, to quickly find the ones that a step intersects."""
+
+    def __init__(self):
+        self.cuboids = Counter()
+        self.index = CuboidIndex()
+
+    def apply(self, step):
+        turn_on, corner1, corner2 = step
+        cuboid = (corner1, corner2)
+        update = Counter()
+        for existing in self.index.query(cuboid):
+            update[intersection(existing, cuboid)] -= self.cuboids[existing]
+        if turn_on:
+            update[cuboid] += 1
+        for changed, sign in update.items():
+            if not sign:
+                continue
+            if changed not in self.cuboids:
+                self.cuboids[changed] = sign
+                self.index.add(changed)
+            elif self.cuboids[changed] + sign:
+                self.cuboids[changed] += sign
+            else:
+                del self.cuboids[changed]
+                self.index.remove(changed)
+
+    def count_lit_cubes(self):
+        return sum(volume(cuboid) * sign for cuboid, sign in self.cuboids.items())
+
+    def __len__(self):
+        return len(self.cuboids)
+
+
+class VoxelReactor:
+    """Executes the steps on a coordinate-compressed voxel grid. All distinct
+    step boundaries along each axis are collected, which cuts the space into
+    a grid of cells that are each either fully lit or fully unlit. The steps
+    are applied as slice assignments on a boolean NumPy array over these cells,
+    after which the lit cubes are counted as the sum of the volumes of the lit
+    cells. This is done for the x-axis in slabs of at most chunk_cells cells,
+    to keep memory use bounded for large step files.
+
+    Since the grid depends on all steps, apply() only collects the steps.
+    The grid is built when counting the lit cubes. The number of entries
+    for this engine is the number of cells in the compressed grid."""
+
+    def __init__(self, chunk_cells=1 << 22):
+        self.steps = []
+        self.chunk_cells = chunk_cells
+
+    def apply(self, step):
+        self.steps.append(step)
+
+    def get_boundaries(self):
+        """Returns for each axis the sorted distinct coordinates at which
+        the cells start, including the end of the last cell."""
+        return [
+            sorted({c1[axis] for _, c1, _ in self.steps} | {c2[axis] + 1 for _, _, c2 in self.steps})
+            for axis in range(3)
+        ]
+
+    def count_lit_cubes(self):
+        import numpy as np
+
+        if not self.steps:
+            return 0
+        boundaries = self.get_boundaries()
+        indexes = [{c: i for i, c in enumerate(b)} for b in boundaries]
+        xi, yi, zi = indexes
+        steps = [
+            (turn_on, xi[x1], xi[x2 + 1], yi[y1], yi[y2 + 1], zi[z1], zi[z2 + 1])
+            for turn_on, (x1, y1, z1), (x2, y2, z2) in self.steps
+        ]
+        dx, dy, dz = (np.diff(np.array(b, dtype=np.int64)) for b in boundaries)
+        nx, ny, nz = len(dx), len(dy), len(dz)
+
+        lit_cubes = 0
+        slab = max(1, self.chunk_cells // (ny * nz))
+        for start in range(0, nx, slab):
+            end = min(nx, start + slab)
+            grid = np.zeros((end - start, ny, nz), dtype=bool)
+            for turn_on, x1, x2, y1, y2, z1, z2 in steps:
+                if x1 < end and x2 > start:
+                    grid[max(x1, start) - start:min(x2, end) - start, y1:y2, z1:z2] = turn_on
+            lit_cubes += int(dx[start:end] @ (grid.astype(np.int64) @ dz @ dy))
+        return lit_cubes
+
+    def __len__(self):
+        nx, ny, nz = (len(b) - 1 for b in self.get_boundaries()) if self.steps else (0, 0, 0)
+        return nx * ny * nz
+
+
+ENGINES = {
+    "list": ListReactor,
+    "indexed": IndexedReactor,
+    "signed": SignedReactor,
+    "voxel": VoxelReactor,
+}
+
+
+def boot_up_reactor(steps, reactor=None):
+    reactor = IndexedReactor() if reactor is None else reactor
+    for step in steps:
+        reactor.apply(step)
+    return reactor
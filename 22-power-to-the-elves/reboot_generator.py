@@ -0,0 +1,51 @@
+#!/bin/env python3
+#
+# This script generates random reactor reboot steps, that can be used as
+# input for testing and benchmarking the reactor engines.
+#
+# Usage: reboot_generator.py <number of steps> [<max size>] [<seed>]
+#
+# Step corners are picked within the -100000..100000 range (like the puzzle
+# input). The edge lengths are spread log-uniformly between 1 and max size,
+# so there are both many small steps and a few big ones. About a quarter of
+# the steps turns cubes off.
+
+from random import Random
+from sys import argv, exit
+
+BOUND = 100000
+
+
+def random_reboot_step(max_size=50000, rng=None):
+    rng = rng or Random()
+    turn_on = rng.randrange(4) != 0
+    corner1 = []
+    corner2 = []
+    for _ in range(3):
+        size = int(max_size ** rng.random())
+        start = rng.randint(-BOUND, BOUND - size)
+        corner1.append(start)
+        corner2.append(start + size - 1)
+    return turn_on, tuple(corner1), tuple(corner2)
+
+
+def format_reboot_step(step):
+    turn_on, (x1, y1, z1), (x2, y2, z2) = step
+    onoff = "on" if turn_on else "off"
+    return f"{onoff} x={x1}..{x2},y={y1}..{y2},z={z1}..{z2}"
+
+
+def generate_reboot_steps(count, max_size=50000, seed=None):
+    rng = Random(seed)
+    return [random_reboot_step(max_size, rng) for _ in range(count)]
+
+
+if __name__ == "__main__":
+    if not 2 <= len(argv) <= 4:
+        print(f"Usage: {argv[0]} <number of steps> [<max size>] [<seed>]")
+        exit(1)
+    count = int(argv[1])
+    max_size = int(argv[2]) if len(argv) > 2 else 50000
+    seed = int(argv[3]) if len(argv) > 3 else None
+    for step in generate_reboot_steps(count, max_size, seed):
+        print(format_reboot_step(step))
@@ -0,0 +1,147 @@
+#!/bin/env python3
+#
+# This script contains unit tests for the reactor module.
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from random import Random
+from reactor import *
+from reboot_generator import generate_reboot_steps
+
+EXAMPLES = [
+    ("example1.txt", 39),
+    ("example2-init-only.txt", 590784),
+    ("example2.txt", 39769202357779),
+    ("example3.txt", 2758514936282235),
+]
+
+
+def random_cuboid(rng, low, high, max_size):
+    corner1 = []
+    corner2 = []
+    for _ in range(3):
+        start = rng.randint(low, high)
+        corner1.append(start)
+        corner2.append(start + rng.randrange(max_size))
+    return tuple(corner1), tuple(corner2)
+
+
+def random_dense_steps(count, seed):
+    """Returns steps in a small region around the origin, so they overlap a lot."""
+    rng = Random(seed)
+    return [
+        (rng.randrange(3) != 0, *random_cuboid(rng, -20, 10, 15))
+        for _ in range(count)
+    ]
+
+
+class TestParser(unittest.TestCase):
+    def test_parses_steps(self):
+        steps = parse_reboot_steps(["on x=-20..26,y=-36..17,z=-47..7\n", "off x=1..2,y=3..4,z=5..6"])
+        self.assertEqual([
+            (True, (-20, -36, -47), (26, 17, 7)),
+            (False, (1, 3, 5), (2, 4, 6)),
+        ], steps)
+
+    def test_reports_syntax_errors(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            steps = parse_reboot_steps(["of x=1..2,y=3..4,z=5..6\n", "on x=1..1,y=1..1,z=1..1\n"])
+        self.assertEqual([(True, (1, 1, 1), (1, 1, 1))], steps)
+        self.assertEqual("Syntax error in: of x=1..2,y=3..4,z=5..6\n", output.getvalue())
+
+    def test_clips_steps(self):
+        steps = [
+            (True, (-60, 0, 10), (-40, 60, 20)),
+            (False, (51, 0, 0), (60, 0, 0)),
+        ]
+        self.assertEqual([(True, (-50, 0, 10), (-40, 50, 20))], clip_reboot_steps(steps))
+
+
+class TestCuboidIndex(unittest.TestCase):
+    def test_query_finds_same_cuboids_as_scan(self):
+        rng = Random(23)
+        index = CuboidIndex()
+        stored = set()
+        for max_size in (1, 3, 50, 2000):
+            for _ in range(200):
+                cuboid = random_cuboid(rng, -1000, 1000, max_size)
+                if cuboid not in stored:
+                    index.add(cuboid)
+                    stored.add(cuboid)
+        for _ in range(300):
+            query = random_cuboid(rng, -1100, 1000, rng.choice((1, 10, 300, 3000)))
+            expected = {cuboid for cuboid in stored if overlapping(cuboid, query)}
+            found = index.query(query)
+            self.assertEqual(len(expected), len(found))
+            self.assertEqual(expected, set(found))
+
+    def test_add_and_remove(self):
+        index = CuboidIndex()
+        a = ((-5, -5, -5), (-1, -1, -1))
+        b = ((-1, -1, -1), (100, 2, 2))
+        index.add(a)
+        index.add(b)
+        self.assertEqual(2, len(index))
+        self.assertEqual({a, b}, set(index.query(((-1, -1, -1), (-1, -1, -1)))))
+        index.remove(a)
+        self.assertEqual(1, len(index))
+        self.assertEqual([b], index.query(((-10, -10, -10), (10, 10, 10))))
+        index.remove(b)
+        self.assertEqual(0, len(index))
+        self.assertEqual({}, index.levels)
+
+
+class TestReactorEngines(unittest.TestCase):
+    def assertEnginesAgree(self, steps):
+        expected = boot_up_reactor(steps, ListReactor()).count_lit_cubes()
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                reactor = boot_up_reactor(steps, ENGINES[name]())
+                self.assertEqual(expected, reactor.count_lit_cubes())
+        return expected
+
+    def test_examples(self):
+        for path, lit_cubes in EXAMPLES:
+            with self.subTest(path=path):
+                self.assertEqual(lit_cubes, self.assertEnginesAgree(load_reboot_steps(path)))
+
+    def test_clipped_example(self):
+        steps = clip_reboot_steps(load_reboot_steps("example2.txt"))
+        self.assertEqual(590784, self.assertEnginesAgree(steps))
+
+    def test_generated_steps(self):
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                self.assertEnginesAgree(generate_reboot_steps(150, 50000, seed))
+
+    def test_dense_steps_with_negative_coordinates(self):
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                self.assertEnginesAgree(random_dense_steps(200, seed))
+
+    def test_no_steps(self):
+        self.assertEnginesAgree([])
+
+    def test_voxel_reactor_in_slabs(self):
+        steps = random_dense_steps(100, 4)
+        expected = boot_up_reactor(steps, ListReactor()).count_lit_cubes()
+        for chunk_cells in (1, 1000, 1 << 22):
+            with self.subTest(chunk_cells=chunk_cells):
+                reactor = boot_up_reactor(steps, VoxelReactor(chunk_cells))
+                self.assertEqual(expected, reactor.count_lit_cubes())
+
+    def test_indexed_reactor_keeps_cuboids_disjoint(self):
+        reactor = boot_up_reactor(random_dense_steps(200, 5), IndexedReactor())
+        cuboids = [
+            cuboid for cells in reactor.index.levels.values()
+            for bucket in cells.values() for cuboid in bucket
+        ]
+        self.assertEqual(len(reactor), len(cuboids))
+        self.assertEqual(reactor.count_lit_cubes(), sum(map(volume, cuboids)))
+        for cuboid in cuboids:
+            self.assertEqual([cuboid], reactor.index.query(cuboid))
+
+
+unittest.main()
@@ -1,7 +1,14 @@
+import hashlib
+import json
+import os
+from itertools import product
+from time import perf_counter
+
 VAR_W = 0
 VAR_X = 1
 VAR_Y = 2
 VAR_Z = 3
+VAR_NAMES = "wxyz"
 
 class ALUSyntaxError(Exception):
     pass
@@ -9,6 +16,9 @@ class ALUSyntaxError(Exception):
 class ALURuntimError(Exception):
     pass
 
+class ALUAnalysisError(Exception):
+    pass
+
 class ALUEmulator:
     def __init__(self):
         self._vars = [0, 0, 0, 0]
@@ -69,12 +79,57 @@ class ALUEmulator:
         self._vars[arg1] = int(self._vars[arg1] == compare_to)
 
 
+def run_batch(instructions, inputs):
+    """Runs parsed instructions (as produced by ALUCompiler.parse()) for
+    a whole batch of inputs at once, using NumPy array operations.
+    The inputs must be an (N, number of inputs) integer array, e.g. an
+    (N, 14) array of serial number digits. Division and modulo follow the
+    same (Python) semantics as ALUEmulator.div and ALUEmulator.mod.
+    Returns the four registers as arrays of length N."""
+    import numpy as np
+
+    inputs = np.asarray(inputs, dtype=np.int64)
+    if inputs.ndim != 2:
+        raise ALURuntimError("Batch inputs must be a two-dimensional array")
+    zeros = np.zeros(len(inputs), dtype=np.int64)
+    registers = [zeros, zeros, zeros, zeros]
+    input_index = 0
+    for _, cmd, arg1, arg2, is_var in instructions:
+        if cmd == "dbg":
+            continue
+        if cmd == "inp":
+            if input_index >= inputs.shape[1]:
+                raise ALURuntimError("Not enough inputs provided for program")
+            registers[arg1] = inputs[:, input_index]
+            input_index += 1
+            continue
+        left = registers[arg1]
+        right = registers[arg2] if is_var else arg2
+        if cmd == "add":
+            registers[arg1] = left + right
+        elif cmd == "mul":
+            registers[arg1] = left * right
+        elif cmd in ("div", "mod"):
+            if np.any(np.equal(right, 0)):
+                raise ZeroDivisionError(f"integer {cmd} by zero")
+            if cmd == "div":
+                registers[arg1] = np.floor_divide(left, right)
+            else:
+                registers[arg1] = np.mod(left, right)
+        elif cmd == "eql":
+            registers[arg1] = np.equal(left, right).astype(np.int64)
+    return tuple(np.array(np.broadcast_to(r, zeros.shape)) for r in registers)
+
+
 class ALUProgram():
     def __init__(self):
         self.instructions = []
+        self.source_instructions = []
 
-    def add_instruction(self, instruction):
+    def add_instruction(self, instruction, source_instruction=None):
         self.instructions.append(instruction)
+        if source_instruction is not None:
+            self.source_instructions.append(source_instruction)
 
     def run(self, *args):
         alu = ALUEmulator()
@@ -85,14 +140,321 @@ class ALUProgram():
             raise ALURuntimError("Not enough inputs provided for program")
         return alu.vars
 
+    def run_batch(self, inputs):
+        """Runs the program for an (N, number of inputs) array of inputs.
+        Returns the four registers (w, x, y, z) as arrays of length N."""
+        return run_batch(self.source_instructions, inputs)
+
+
+class ALUPythonProgram():
+    """An ALU program that was translated into a single Python function.
+    This avoids the per-instruction dispatching overhead of the ALUProgram
+    closure chain, at the cost of not supporting the dbg instruction."""
+
+    def __init__(self, instructions, source):
+        self.source_instructions = instructions
+        self.source = source
+        namespace = {}
+        exec(compile(source, "<alu>", "exec"), namespace)
+        self.func = namespace["alu_program"]
+
+    def run(self, *args):
+        try:
+            return self.func(args)
+        except IndexError:
+            raise ALURuntimError("Not enough inputs provided for program")
+
+    def run_from(self, registers, *args):
+        """Like run(), but starting with the provided register values
+        (w, x, y, z) instead of all zeroes."""
+        try:
+            return self.func(args, *registers)
+        except IndexError:
+            raise ALURuntimError("Not enough inputs provided for program")
+
+    def run_batch(self, inputs):
+        """Runs the program for an (N, number of inputs) array of inputs.
+        Returns the four registers (w, x, y, z) as arrays of length N."""
+        return run_batch(self.source_instructions, inputs)
+
+
+class ALUOptimizer:
+    """The ALUOptimizer rewrites a list of parsed instructions (as produced
+    by ALUCompiler.parse()) into an equivalent, shorter list.
+
+    Constant folding: registers that hold a known constant are tracked.
+    Operations on known constants are evaluated at compile time, and the
+    resulting constant is only written to the register when it is actually
+    needed. No-ops like "add r 0", "mul r 1" and "div r 1" are dropped.
+
+    Dead code elimination: writes to a register that are overwritten
+    before being read are removed. All registers are considered read at
+    the end of the program (they are its output) and at every dbg
+    instruction. Divisions and modulos by a register or by zero are always
+    kept, so a division by zero still fails at runtime.
+
+    After running optimize(), the number of removed instructions is
+    available as the eliminated attribute."""
+
+    def __init__(self):
+        self.eliminated = 0
+
+    def optimize(self, instructions):
+        optimized = self.eliminate_dead_code(self.fold_constants(instructions))
+        self.eliminated = len(instructions) - len(optimized)
+        return optimized
+
+    def fold_constants(self, instructions):
+        # value: the known constant value of each register (None = unknown).
+        # actual: the constant that is physically in the register (None =
+        # unknown). Writing a known value to a register is delayed until an
+        # instruction actually needs it in the register.
+        value = [0, 0, 0, 0]
+        actual = [0, 0, 0, 0]
+        result = []
+
+        def materialize(var):
+            if value[var] is None or actual[var] == value[var]:
+                return
+            if actual[var] is None:
+                result.append(self.make_instruction("mul", var, 0, False))
+                if value[var] != 0:
+                    result.append(self.make_instruction("add", var, value[var], False))
+            else:
+                result.append(
+                    self.make_instruction("add", var, value[var] - actual[var], False)
+                )
+            actual[var] = value[var]
+
+        for instruction in instructions:
+            src_line, cmd, arg1, arg2, is_var = instruction
+            if cmd == "dbg":
+                for var in range(4):
+                    materialize(var)
+                result.append(instruction)
+                continue
+            if cmd == "inp":
+                value[arg1] = actual[arg1] = None
+                result.append(instruction)
+                continue
+
+            if is_var and value[arg2] is not None:
+                arg2, is_var = value[arg2], False
+            folded = self.fold(cmd, value[arg1], arg1, arg2, is_var)
+            if folded is not None:
+                value[arg1] = folded
+                continue
+            if not is_var and arg2 == 1 and cmd in ("mul", "div"):
+                continue
+            if not is_var and arg2 == 0 and cmd == "add":
+                continue
+
+            materialize(arg1)
+            if (cmd, arg1, arg2, is_var) == instruction[1:]:
+                result.append(instruction)
+            else:
+                result.append(self.make_instruction(cmd, arg1, arg2, is_var))
+            value[arg1] = actual[arg1] = None
+
+        for var in range(4):
+            materialize(var)
+        return result
+
+    def fold(self, cmd, left, arg1, arg2, is_var):
+        """Returns the constant result of an operation, or None when the
+        result can not be determined at compile time."""
+        if not is_var:
+            if cmd == "mul" and arg2 == 0:
+                return 0
+            if cmd == "mod" and arg2 == 1:
+                return 0
+        elif cmd == "eql" and arg2 == arg1:
+            return 1
+        if cmd == "mul" and left == 0:
+            return 0
+        if left is None or is_var:
+            return None
+        if cmd == "add":
+            return left + arg2
+        if cmd == "mul":
+            return left * arg2
+        if cmd == "div" and arg2 != 0:
+            return left // arg2
+        if cmd == "mod" and arg2 != 0:
+            return left % arg2
+        if cmd == "eql":
+            return int(left == arg2)
+        return None
+
+    def eliminate_dead_code(self, instructions):
+        live = {VAR_W, VAR_X, VAR_Y, VAR_Z}
+        result = []
+        for instruction in reversed(instructions):
+            _, cmd, arg1, arg2, is_var = instruction
+            if cmd == "dbg":
+                live = {VAR_W, VAR_X, VAR_Y, VAR_Z}
+            elif cmd == "inp":
+                # Input instructions are always kept, since they consume
+                # an input value.
+                live.discard(arg1)
+            elif arg1 not in live and not self.may_divide_by_zero(cmd, arg2, is_var):
+                continue
+            elif is_var:
+                live.add(arg2)
+            result.append(instruction)
+        result.reverse()
+        return result
+
+    def may_divide_by_zero(self, cmd, arg2, is_var):
+        return cmd in ("div", "mod") and (is_var or arg2 == 0)
+
+    def make_instruction(self, cmd, arg1, arg2, is_var):
+        right = VAR_NAMES[arg2] if is_var else arg2
+        return (f"{cmd} {VAR_NAMES[arg1]} {right}", cmd, arg1, arg2, is_var)
+
 
 class ALUCompiler:
     """The ALUCompiler can be used to translate ALU source code into
-    a working ALU program."""
+    a working ALU program. When optimize is enabled, the ALUOptimizer
+    is run on the parsed source code before generating the program.
+
+    When a cache_dir is provided, the parsed (and optimized) instructions
+    are stored on disk, so compiling the same source code again skips
+    parsing and optimization. Cache entries are keyed by a hash of the
+    source code, the optimize flag and the source of this module, so
+    changes to either the ALU source or the compiler invalidate them."""
+
+    def __init__(self, optimize=False, cache_dir=None):
+        self.optimizer = ALUOptimizer() if optimize else None
+        self.cache_dir = cache_dir
+        self.cache_hit = False
+
+    @property
+    def eliminated(self):
+        """The number of instructions that were removed by the optimizer
+        during the last compile."""
+        return self.optimizer.eliminated if self.optimizer else 0
 
     def compile(self, src):
-        """Compiles lines of source code into an ALU program."""
+        """Compiles lines of source code into an ALU program, that runs
+        every instruction through the ALUEmulator. This is the slow path,
+        which supports debugging through the dbg instruction."""
         program = ALUProgram()
+        for source_instruction in self.prepare(src):
+            src_line, cmd, arg1, arg2, is_var = source_instruction
+            if cmd == "dbg":
+                instruction = self.make_dbg_instruction(src_line, arg1)
+            elif cmd == "inp":
+                instruction = self.make_inp_instruction(src_line, arg1)
+            elif cmd == "add":
+                instruction = self.make_add_instruction(src_line, arg1, arg2, is_var)
+            elif cmd == "mul":
+                instruction = self.make_mul_instruction(src_line, arg1, arg2, is_var)
+            elif cmd == "div":
+                instruction = self.make_div_instruction(src_line, arg1, arg2, is_var)
+            elif cmd == "mod":
+                instruction = self.make_mod_instruction(src_line, arg1, arg2, is_var)
+            elif cmd == "eql":
+                instruction = self.make_eql_instruction(src_line, arg1, arg2, is_var)
+            program.add_instruction(instruction, source_instruction)
+
+        return program
+
+    def compile_to_python(self, src):
+        """Compiles lines of source code into an ALU program, that runs
+        the full program as a single straight-line Python function.
+        This is the fast path. The dbg instruction is ignored here."""
+        instructions = self.prepare(src)
+        return ALUPythonProgram(instructions, self.generate_python(instructions))
+
+    def generate_python(self, instructions):
+        """Generates the Python source code for a list of parsed
+        instructions (as produced by parse())."""
+        code = ["def alu_program(args, w=0, x=0, y=0, z=0):"]
+        input_index = 0
+        for src_line, cmd, arg1, arg2, is_var in instructions:
+            if cmd == "dbg":
+                continue
+            left = VAR_NAMES[arg1]
+            if cmd == "inp":
+                code.append(f"    {left} = args[{input_index}]")
+                input_index += 1
+                continue
+            right = VAR_NAMES[arg2] if is_var else str(arg2)
+            if cmd == "add":
+                code.append(f"    {left} += {right}")
+            elif cmd == "mul":
+                code.append(f"    {left} *= {right}")
+            elif cmd == "div":
+                code.append(f"    {left} //= {right}")
+            elif cmd == "mod":
+                code.append(f"    {left} %= {right}")
+            elif cmd == "eql":
+                code.append(f"    {left} = 1 if {left} == {right} else 0")
+        code.append("    return w, x, y, z")
+        return "\n".join(code) + "\n"
+
+    def prepare(self, src):
+        """Parses lines of source code, and optimizes the resulting
+        instructions when optimization is enabled. When a cache_dir is
+        used, the result is loaded from or stored in the cache."""
+        self.cache_hit = False
+        if not self.cache_dir:
+            return self.parse_and_optimize(src)
+
+        src = list(src)
+        cache_path = os.path.join(self.cache_dir, self.get_cache_key(src) + ".json")
+        instructions = self.load_from_cache(cache_path)
+        if instructions is not None:
+            self.cache_hit = True
+            return instructions
+        instructions = self.parse_and_optimize(src)
+        self.store_in_cache(cache_path, instructions)
+        return instructions
+
+    def parse_and_optimize(self, src):
+        instructions = self.parse(src)
+        if self.optimizer:
+            instructions = self.optimizer.optimize(instructions)
+        return instructions
+
+    def get_cache_key(self, src):
+        with open(__file__, "rb") as f:
+            compiler_source = f.read()
+        digest = hashlib.sha256(compiler_source)
+        digest.update(b"optimize" if self.optimizer else b"plain")
+        for line in src:
+            digest.update(line.rstrip("\n").encode())
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def load_from_cache(self, cache_path):
+        try:
+            with open(cache_path, "r") as f:
+                data = json.load(f)
+            instructions = [tuple(instruction) for instruction in data["instructions"]]
+            eliminated = data["eliminated"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if self.optimizer:
+            self.optimizer.eliminated = eliminated
+        return instructions
+
+    def store_in_cache(self, cache_path, instructions):
+        data = {"instructions": instructions, "eliminated": self.eliminated}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temporary file first, so concurrent readers never
+        # see a partially written cache entry.
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, cache_path)
+
+    def parse(self, src):
+        """Parses lines of source code into a list of instructions.
+        Each instruction is a tuple (src_line, cmd, arg1, arg2, is_var).
+        For inp, arg2 is None. For dbg, arg1 is the on/off flag."""
+        instructions = []
         for line in src:
             src_line = line.strip()
             line = src_line
@@ -102,42 +464,23 @@ class ALUCompiler:
             if not parts:
                 continue
 
-            instruction = None
             cmd = parts.pop(0)
+            arg2, is_var = None, False
             if cmd == "dbg":
-                on_off = bool(parts.pop())
-                instruction = self.make_dbg_instruction(src_line, on_off)
+                arg1 = bool(parts.pop())
             elif cmd == "inp":
-                var = self.get_var(line, parts)
-                instruction = self.make_inp_instruction(src_line, var)
-            elif cmd == "add":
                 arg1 = self.get_var(line, parts)
-                arg2, is_var = self.get_var_or_int(line, parts)
-                instruction = self.make_add_instruction(src_line, arg1, arg2, is_var)
-            elif cmd == "mul":
-                arg1 = self.get_var(line, parts)
-                arg2, is_var = self.get_var_or_int(line, parts)
-                instruction = self.make_mul_instruction(src_line, arg1, arg2, is_var)
-            elif cmd == "div":
-                arg1 = self.get_var(line, parts)
-                arg2, is_var = self.get_var_or_int(line, parts)
-                instruction = self.make_div_instruction(src_line, arg1, arg2, is_var)
-            elif cmd == "mod":
-                arg1 = self.get_var(line, parts)
-                arg2, is_var = self.get_var_or_int(line, parts)
-                instruction = self.make_mod_instruction(src_line, arg1, arg2, is_var)
-            elif cmd == "eql":
+            elif cmd in ("add", "mul", "div", "mod", "eql"):
                 arg1 = self.get_var(line, parts)
                 arg2, is_var = self.get_var_or_int(line, parts)
-                instruction = self.make_eql_instruction(src_line, arg1, arg2, is_var)
             else:
                 raise ALUSyntaxError("Unknown operation:", line)
             if parts:
                 raise ALUSyntaxError("Too many arguments:", line)
 
-            program.add_instruction(instruction)
+            instructions.append((src_line, cmd, arg1, arg2, is_var))
 
-        return program
+        return instructions
 
     def get_var_or_int(self, line, parts):
         try:
@@ -200,3 +543,245 @@ class ALUCompiler:
             alu.exec(src_line, alu.eql, arg1, arg2, is_var)
             return args
         return instruction_
+
+
+class ALUAnalyzer:
+    """The ALUAnalyzer derives the digit constraints for a serial number
+    checksum program (MONAD) from its source code, instead of having to
+    work them out by hand (see strategy.txt).
+
+    The program must consist of 14 blocks, that each read one digit and
+    that follow the same template, only differing in three parameters:
+    the divisor for z (1 or 26) and the offsets added to x and y.
+    Using z as a stack of base 26 numbers, blocks with divisor 1 push
+    "digit + y offset", and blocks with divisor 26 pop a value and compare
+    it to "digit - x offset". For z to end up being 0, every pop must match.
+    This results in one constraint per push/pop pair of digits."""
+
+    BLOCK_TEMPLATE = [
+        ("inp", VAR_W, None, False),
+        ("mul", VAR_X, 0, False),
+        ("add", VAR_X, VAR_Z, True),
+        ("mod", VAR_X, 26, False),
+        ("div", VAR_Z, "div_z", False),
+        ("add", VAR_X, "add_x", False),
+        ("eql", VAR_X, VAR_W, True),
+        ("eql", VAR_X, 0, False),
+        ("mul", VAR_Y, 0, False),
+        ("add", VAR_Y, 25, False),
+        ("mul", VAR_Y, VAR_X, True),
+        ("add", VAR_Y, 1, False),
+        ("mul", VAR_Z, VAR_Y, True),
+        ("mul", VAR_Y, 0, False),
+        ("add", VAR_Y, VAR_W, True),
+        ("add", VAR_Y, "add_y", False),
+        ("mul", VAR_Y, VAR_X, True),
+        ("add", VAR_Z, VAR_Y, True),
+    ]
+
+    def analyze(self, src):
+        """Analyzes lines of source code. Returns a list of constraints
+        (i, j, offset), meaning: digit[j] = digit[i] + offset, where i and j
+        are zero-based digit positions and i < j."""
+        blocks = self.split_blocks(ALUCompiler().parse(src))
+        constraints = []
+        stack = []
+        for position, block in enumerate(blocks):
+            params = self.match_block(position, block)
+            if params["div_z"] == 1:
+                if params["add_x"] < 10:
+                    raise ALUAnalysisError(
+                        f"Block for digit {position + 1} does not always push")
+                stack.append((position, params["add_y"]))
+            elif params["div_z"] == 26:
+                if not stack:
+                    raise ALUAnalysisError(
+                        f"Block for digit {position + 1} pops from an empty stack")
+                pushed_position, add_y = stack.pop()
+                offset = add_y + params["add_x"]
+                constraints.append((pushed_position, position, offset))
+            else:
+                raise ALUAnalysisError(
+                    f"Block for digit {position + 1} divides z by {params['div_z']}")
+        if stack:
+            raise ALUAnalysisError("Not all pushed digits are popped again")
+        return sorted(constraints)
+
+    def split_blocks(self, instructions):
+        blocks = []
+        for instruction in instructions:
+            if instruction[1] == "dbg":
+                continue
+            if instruction[1] == "inp":
+                blocks.append([])
+            elif not blocks:
+                raise ALUAnalysisError("Program does not start with an inp instruction")
+            blocks[-1].append(instruction)
+        if len(blocks) != 14:
+            raise ALUAnalysisError(f"Expected 14 digit blocks, found {len(blocks)}")
+        return blocks
+
+    def match_block(self, position, block):
+        if len(block) != len(self.BLOCK_TEMPLATE):
+            raise ALUAnalysisError(
+                f"Block for digit {position + 1} does not match the MONAD pattern")
+        params = {}
+        for (src_line, cmd, arg1, arg2, is_var), expected in zip(
+            block, self.BLOCK_TEMPLATE
+        ):
+            expected_cmd, expected_arg1, expected_arg2, expected_is_var = expected
+            if isinstance(expected_arg2, str) and not is_var:
+                params[expected_arg2] = arg2
+                expected_arg2 = arg2
+            if (cmd, arg1, arg2, is_var) != (
+                expected_cmd, expected_arg1, expected_arg2, expected_is_var
+            ):
+                raise ALUAnalysisError(
+                    f"Unexpected instruction for digit {position + 1}: {src_line}")
+        return params
+
+
+class ALUSolver:
+    """The ALUSolver finds the smallest and the largest valid serial number
+    for a serial number checksum program, without needing to know how the
+    program works. A serial number is valid when the program ends with z = 0.
+
+    The program is split into blocks that each start with an inp instruction.
+    The blocks are run one at a time for every possible digit, starting from
+    the set of register states that the previous block produced. States are
+    deduplicated, keeping only the smallest and largest prefix that lead to
+    them. Registers that are not read anymore before being overwritten are
+    zeroed, so for MONAD only z ends up in the state.
+
+    When prune is enabled, states are dropped when their z value is too
+    large to get back to 0 with the remaining "div z <n>" instructions. This
+    assumes that z is not reduced in any other way, which holds for MONAD.
+
+    After running solve(), the stats attribute contains a tuple
+    (block, number of states, seconds) for every block."""
+
+    def __init__(self, digits=range(1, 10), prune=True):
+        self.digits = list(digits)
+        self.prune = prune
+        self.stats = []
+
+    @property
+    def peak_states(self):
+        return max((states for _, states, _ in self.stats), default=0)
+
+    def solve(self, src):
+        """Returns the smallest and the largest valid serial number (as
+        integers), or None, None when no valid serial number exists."""
+        compiler = ALUCompiler()
+        blocks = self.split_blocks(compiler.parse(src))
+        programs = [
+            ALUPythonProgram(block, compiler.generate_python(block))
+            for block in blocks
+        ]
+        live_registers = self.find_live_registers(blocks)
+        z_limits = self.find_z_limits(blocks)
+
+        self.stats = []
+        states = {(0, 0, 0, 0): (0, 0)}
+        for index, program in enumerate(programs):
+            started = perf_counter()
+            live = live_registers[index + 1]
+            z_limit = z_limits[index + 1] if self.prune else None
+            next_states = {}
+            for registers, (smallest, largest) in states.items():
+                for digit in self.digits:
+                    result = program.run_from(registers, digit)
+                    if z_limit is not None and abs(result[VAR_Z]) >= z_limit:
+                        continue
+                    state = tuple(v if i in live else 0 for i, v in enumerate(result))
+                    prefix_min = smallest * 10 + digit
+                    prefix_max = largest * 10 + digit
+                    known = next_states.get(state)
+                    if known is None:
+                        next_states[state] = (prefix_min, prefix_max)
+                    else:
+                        next_states[state] = (
+                            min(known[0], prefix_min), max(known[1], prefix_max)
+                        )
+            states = next_states
+            self.stats.append((index + 1, len(states), perf_counter() - started))
+
+        valid = [prefixes for state, prefixes in states.items() if state[VAR_Z] == 0]
+        if not valid:
+            return None, None
+        return (
+            min(smallest for smallest, _ in valid),
+            max(largest for _, largest in valid)
+        )
+
+    def split_blocks(self, instructions):
+        blocks = []
+        for instruction in instructions:
+            if instruction[1] == "dbg":
+                continue
+            if instruction[1] == "inp" or not blocks:
+                blocks.append([])
+            blocks[-1].append(instruction)
+        if blocks and blocks[0][0][1] != "inp":
+            raise ALUAnalysisError("Program does not start with an inp instruction")
+        return blocks
+
+    def find_live_registers(self, blocks):
+        """Returns for every block boundary the registers that are read
+        before being overwritten by the rest of the program. Besides inp,
+        "mul r 0" counts as an overwrite, since MONAD uses it to reset
+        x and y."""
+        live = {VAR_Z}
+        result = [live]
+        for block in reversed(blocks):
+            live = set(live)
+            for _, cmd, arg1, arg2, is_var in reversed(block):
+                if cmd == "inp" or (cmd == "mul" and not is_var and arg2 == 0):
+                    # Both overwrite the register without reading it.
+                    live.discard(arg1)
+                elif arg1 in live and is_var:
+                    live.add(arg2)
+            result.append(live)
+        result.reverse()
+        return result
+
+    def find_z_limits(self, blocks):
+        """Returns for every block boundary the value that z must stay
+        below to be able to get back to 0 with the remaining divisions."""
+        limit = 1
+        result = [limit]
+        for block in reversed(blocks):
+            for _, cmd, arg1, arg2, is_var in block:
+                if cmd == "div" and arg1 == VAR_Z and not is_var:
+                    limit *= abs(arg2)
+            result.append(limit)
+        result.reverse()
+        return result
+
+
+def generate_serials(constraints):
+    """Generates all valid serial numbers (as lists of digits, in ascending
+    order) for the constraints as produced by ALUAnalyzer.analyze()."""
+    ranges = [
+        range(max(1, 1 - offset), min(9, 9 - offset) + 1)
+        for _, _, offset in constraints
+    ]
+    for digits in product(*ranges):
+        serial = [0] * 14
+        for (i, j, offset), digit in zip(constraints, digits):
+            serial[i] = digit
+            serial[j] = digit + offset
+        yield serial
+
+
+def find_min_max_serials(constraints):
+    """Returns the smallest and the largest valid serial number (as lists
+    of digits) for the constraints as produced by ALUAnalyzer.analyze()."""
+    smallest = [0] * 14
+    largest = [0] * 14
+    for i, j, offset in constraints:
+        smallest[i] = max(1, 1 - offset)
+        smallest[j] = smallest[i] + offset
+        largest[i] = min(9, 9 - offset)
+        largest[j] = largest[i] + offset
+    return smallest, largest
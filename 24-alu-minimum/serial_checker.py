@@ -1,36 +1,137 @@
 #!/bin/env python3
+#
+# Usage: serial_checker.py <serial>
+#        serial_checker.py -            (check serials from stdin in one batch)
+#        serial_checker.py --stream [<file>|-] [<workers>] [<chunk size>]
+#
+# Batch mode can be used to validate all generated serials at once:
+#   ./serial_generator.py | ./serial_checker.py -
+#
+# Stream mode reads serials from a file or stdin without loading them all
+# in memory. The program is compiled once per worker process, and chunks of
+# serials are checked in parallel. A verdict is written for every serial
+# (in input order) and the throughput is reported on stderr at the end:
+#   ./serial_generator.py | ./serial_checker.py --stream - 8 10000
 
 import re
 from alu import *
-from sys import argv, exit
+from itertools import islice
+from multiprocessing import Pool
+from os import cpu_count
+from sys import argv, exit, stdin, stderr
+from time import perf_counter
+
+SERIAL_PATTERN = re.compile(r"^[1-9]{14}$")
 
 
 def load_program():
     with open("serial_checksum.alu", "r") as f:
         src = list(f)
-    return ALUCompiler().compile(src)
+    compiler = ALUCompiler(optimize=True, cache_dir=".alu_cache")
+    return compiler.compile_to_python(src)
 
 
-def get_serial_to_check():
-    serial = argv[1]
-    if not re.match(r"^[1-9]{14}$", serial):
-        print("Malformed serial number!")
+def parse_serial(serial):
+    if not SERIAL_PATTERN.match(serial):
+        print(f"Malformed serial number: {serial}")
         exit(2)
     return list(map(int, serial))
 
-    
-if len(argv) != 2:
-    print(f"Usage: {argv[0]} <serial>")
-    exit(1)
 
-serial = get_serial_to_check()
-checksum_computer = load_program()
-_, _, _, checksum = checksum_computer.run(*serial)
+def check_single_serial(serial):
+    serial = parse_serial(serial)
+    checksum_computer = load_program()
+    _, _, _, checksum = checksum_computer.run(*serial)
+
+    if checksum == 0:
+        print("Valid serial number")
+        exit(0)
+    else:
+        print("Invalid serial number")
+        exit(3)
+
+
+def check_serials_in_batch(serials):
+    serials = [serial.strip() for serial in serials if serial.strip()]
+    if not serials:
+        print("No serial numbers to check")
+        exit(1)
+    digits = [parse_serial(serial) for serial in serials]
+    checksum_computer = load_program()
+    _, _, _, checksums = checksum_computer.run_batch(digits)
+
+    invalid = [serial for serial, checksum in zip(serials, checksums) if checksum]
+    for serial in invalid:
+        print(f"Invalid serial number: {serial}")
+    print(f"Checked {len(serials)} serial numbers, {len(invalid)} invalid")
+    exit(3 if invalid else 0)
+
+
+def init_stream_worker():
+    global checksum_computer
+    checksum_computer = load_program()
+
+
+def check_stream_chunk(serials):
+    wellformed = [serial for serial in serials if SERIAL_PATTERN.match(serial)]
+    checksums = {}
+    if wellformed:
+        digits = [list(map(int, serial)) for serial in wellformed]
+        _, _, _, z = checksum_computer.run_batch(digits)
+        checksums = dict(zip(wellformed, z))
+    verdicts = []
+    for serial in serials:
+        if serial not in checksums:
+            verdicts.append(f"{serial} malformed")
+        elif checksums[serial] == 0:
+            verdicts.append(f"{serial} valid")
+        else:
+            verdicts.append(f"{serial} invalid")
+    return verdicts
+
+
+def read_chunks(lines, chunk_size):
+    serials = (line.strip() for line in lines if line.strip())
+    while chunk := list(islice(serials, chunk_size)):
+        yield chunk
+
+
+def check_serials_in_stream(lines, workers, chunk_size):
+    started = perf_counter()
+    checked = 0
+    not_valid = 0
+    with Pool(workers, initializer=init_stream_worker) as pool:
+        for verdicts in pool.imap(check_stream_chunk, read_chunks(lines, chunk_size)):
+            checked += len(verdicts)
+            not_valid += sum(not verdict.endswith(" valid") for verdict in verdicts)
+            print("\n".join(verdicts))
+    elapsed = perf_counter() - started
+    rate = checked / elapsed if elapsed else 0
+    print(
+        f"Checked {checked} serial numbers, {not_valid} not valid, "
+        f"{elapsed:.3f}s ({rate:.0f} serials/sec)", file=stderr)
+    exit(3 if not_valid else 0)
+
+
+def stream_mode(args):
+    path = args[0] if args else "-"
+    workers = int(args[1]) if len(args) > 1 else cpu_count()
+    chunk_size = int(args[2]) if len(args) > 2 else 10000
+    if path == "-":
+        check_serials_in_stream(stdin, workers, chunk_size)
+    with open(path, "r") as f:
+        check_serials_in_stream(f, workers, chunk_size)
+
 
-if checksum == 0:
-    print("Valid serial number")
-    exit(0)
-else:
-    print("Invalid serial number")
-    exit(3)
+if __name__ == "__main__":
+    if len(argv) >= 2 and argv[1] == "--stream":
+        stream_mode(argv[2:])
+    if len(argv) != 2:
+        print(f"Usage: {argv[0]} <serial|->")
+        print(f"       {argv[0]} --stream [<file>|-] [<workers>] [<chunk size>]")
+        exit(1)
 
+    if argv[1] == "-":
+        check_serials_in_batch(stdin)
+    else:
+        check_single_serial(argv[1])
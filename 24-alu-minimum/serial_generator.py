@@ -1,34 +1,28 @@
 #!/bin/env python3
 #
-# This script generates valid serial numbers based on my puzzle input.
-# For information on how I got to this code, see the file strategy.txt.
+# This script generates valid serial numbers for an ALU serial number
+# checksum program. The digit constraints are derived from the program
+# by the ALUAnalyzer. For information on how I initially got to these
+# constraints by hand, see the file strategy.txt.
+#
+# Usage: serial_generator.py [program.alu] [--min-max]
+
+from alu import *
+from sys import argv
+
 
-from itertools import product
+def load_constraints(path):
+    with open(path, "r") as f:
+        return ALUAnalyzer().analyze(f)
 
-serial = [0] * 15
 
-p1s = [1]
-p2s = [1, 2]
-p3s = [8, 9]
-p5s = [1, 2, 3, 4, 5, 6]
-p6s = [2, 3, 4, 5, 6, 7, 8, 9]
-p7s = [3, 4, 5, 6, 7, 8, 9]
-p11s = [7, 8, 9]
-serial_number_bases = product(p1s, p2s, p3s, p5s, p6s, p7s, p11s)
+args = [arg for arg in argv[1:] if arg != "--min-max"]
+constraints = load_constraints(args[0] if args else "serial_checksum.alu")
 
-for p1, p2, p3, p5, p6, p7, p11 in serial_number_bases:
-    serial[1] = p1
-    serial[2] = p2
-    serial[3] = p3
-    serial[4] = p5 + 3
-    serial[5] = p5
-    serial[6] = p6
-    serial[7] = p7
-    serial[8] = p7 - 2
-    serial[9] = p6 - 1
-    serial[10] = p3 - 7
-    serial[11] = p11
-    serial[12] = p11 - 6
-    serial[13] = p2 + 7
-    serial[14] = p1 + 8
-    print("".join(map(str, serial[1:])))
+if "--min-max" in argv:
+    smallest, largest = find_min_max_serials(constraints)
+    print("Smallest:", "".join(map(str, smallest)))
+    print("Largest: ", "".join(map(str, largest)))
+else:
+    for serial in generate_serials(constraints):
+        print("".join(map(str, serial)))
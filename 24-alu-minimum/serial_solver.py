@@ -0,0 +1,33 @@
+#!/bin/env python3
+#
+# This script finds the smallest and the largest valid serial number for an
+# ALU serial number checksum program, by searching the state space one digit
+# block at a time. Unlike serial_generator.py, this does not depend on the
+# structure of the program.
+#
+# Usage: serial_solver.py [program.alu]
+
+from alu import *
+from sys import argv
+from time import perf_counter
+
+
+path = argv[1] if len(argv) > 1 else "serial_checksum.alu"
+with open(path, "r") as f:
+    src = list(f)
+
+started = perf_counter()
+solver = ALUSolver()
+smallest, largest = solver.solve(src)
+elapsed = perf_counter() - started
+
+for block, states, seconds in solver.stats:
+    print(f"Block {block:2d}: {states:8d} states in {seconds:.3f}s")
+print(f"Peak state count: {solver.peak_states}")
+print(f"Total time: {elapsed:.3f}s")
+
+if smallest is None:
+    print("No valid serial number exists")
+else:
+    print("Smallest:", smallest)
+    print("Largest: ", largest)
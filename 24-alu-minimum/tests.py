@@ -2,7 +2,10 @@
 #
 # This script contains unit tests for the alu module.
 
+import os
+import tempfile
 import unittest
+from itertools import product
 from alu import *
 
 
@@ -91,11 +94,14 @@ class TestALUEmulator(unittest.TestCase):
 
 
 class TestALUCompiler(unittest.TestCase):
+    def compile(self, src):
+        return ALUCompiler().compile(src)
+
     def test_can_create_compiler(self):
         ALUCompiler()
 
     def test_can_compile_empty_program(self):
-        program = ALUCompiler().compile([""])
+        program = self.compile([""])
         result = program.run()
         self.assertEqual((0, 0, 0, 0), result)
 
@@ -113,12 +119,12 @@ class TestALUCompiler(unittest.TestCase):
             ("z", (0, 0, 0, 1)),
         ]:
             with self.subTest():
-                program = ALUCompiler().compile([f"inp {var_name}"])
+                program = self.compile([f"inp {var_name}"])
                 result = program.run(1)
                 self.assertEqual(expected, result)
 
     def test_can_compile_multiple_instructions(self):
-        program = ALUCompiler().compile([
+        program = self.compile([
             " inp w",
             "inp x ",
             "inp  y",
@@ -127,7 +133,7 @@ class TestALUCompiler(unittest.TestCase):
         self.assertEqual((-2, -1, 0, 1), program.run(-2, -1, 0, 1))
 
     def test_can_compile_add(self):
-        program = ALUCompiler().compile([
+        program = self.compile([
             "inp x",
             "inp y",
             "add x y"
@@ -135,7 +141,7 @@ class TestALUCompiler(unittest.TestCase):
         self.assertEqual((0, 42, 10, 0), program.run(32, 10))
 
     def test_can_use_number_for_second_argument(self):
-        program = ALUCompiler().compile([
+        program = self.compile([
             "inp x",
             "add x 5"
         ])
@@ -143,7 +149,7 @@ class TestALUCompiler(unittest.TestCase):
         self.assertEqual((0, 10, 0, 0), program.run(5))
 
     def test_can_compile_mul(self):
-        program = ALUCompiler().compile([
+        program = self.compile([
             "inp x",
             "inp y",
             "mul x y"
@@ -151,7 +157,7 @@ class TestALUCompiler(unittest.TestCase):
         self.assertEqual((0, 42, 7, 0), program.run(6, 7))
 
     def test_can_compile_div_and_mod(self):
-        program = ALUCompiler().compile([
+        program = self.compile([
             "inp w",
             "inp x",
             "inp y",
@@ -163,7 +169,7 @@ class TestALUCompiler(unittest.TestCase):
         self.assertEqual((2, 2, 0, 2), program.run(4, 2, 4, 2))
 
     def test_can_compile_eql(self):
-        program = ALUCompiler().compile([
+        program = self.compile([
             "inp w",
             "inp x",
             "eql w x"
@@ -172,6 +178,11 @@ class TestALUCompiler(unittest.TestCase):
         self.assertEqual((0, 7, 0, 0), program.run(6, 7))
         self.assertEqual((1, 6, 0, 0), program.run(6, 6))
 
+    def test_exception_when_not_enough_inputs_provided(self):
+        program = self.compile(["inp w", "inp x"])
+        with self.assertRaises(ALURuntimError):
+            program.run(1)
+
     def test_exception_when_using_not_enough_arguments(self):
         with self.assertRaises(ALUSyntaxError) as context:
             ALUCompiler().compile(["inp"])
@@ -183,7 +194,7 @@ class TestALUCompiler(unittest.TestCase):
         self.assertIn("Too many arguments", str(context.exception))
 
     def test_compile_to_binary_example(self):
-        program = ALUCompiler().compile([
+        program = self.compile([
             "inp w",
             "add z w",
             "mod z 2",
@@ -205,4 +216,306 @@ class TestALUCompiler(unittest.TestCase):
         self.assertEqual((1, 1, 1, 1), program.run(15))
 
 
+class TestALUBatch(unittest.TestCase):
+    def test_batch_matches_single_runs(self):
+        program = ALUCompiler().compile([
+            "inp w",
+            "inp x",
+            "add y w",
+            "mul y x",
+            "div w x",
+            "mod y 5",
+            "eql z y",
+        ])
+        inputs = [(13, 4), (-7, 2), (7, -2), (-7, -2), (0, 1), (9, 9)]
+        w, x, y, z = program.run_batch(inputs)
+        for i, args in enumerate(inputs):
+            with self.subTest(args=args):
+                self.assertEqual(program.run(*args), (w[i], x[i], y[i], z[i]))
+
+    def test_batch_returns_arrays_for_untouched_registers(self):
+        program = ALUCompiler().compile(["inp w"])
+        w, x, y, z = program.run_batch([[1], [2], [3]])
+        self.assertEqual([1, 2, 3], list(w))
+        self.assertEqual([0, 0, 0], list(z))
+
+    def test_batch_exception_when_not_enough_inputs_provided(self):
+        program = ALUCompiler().compile(["inp w", "inp x"])
+        with self.assertRaises(ALURuntimError):
+            program.run_batch([[1], [2]])
+
+    def test_batch_exception_on_division_by_zero(self):
+        program = ALUCompiler().compile(["inp w", "inp x", "div w x"])
+        with self.assertRaises(ZeroDivisionError):
+            program.run_batch([[1, 1], [2, 0]])
+
+    def test_batch_on_serial_checksum(self):
+        with open("serial_checksum.alu", "r") as f:
+            program = ALUCompiler().compile_to_python(list(f))
+        serials = ["11841231117189", "12996997819389", "13579246899999"]
+        digits = [list(map(int, serial)) for serial in serials]
+        _, _, _, z = program.run_batch(digits)
+        for i, serial in enumerate(digits):
+            with self.subTest(serial=serials[i]):
+                self.assertEqual(program.run(*serial)[VAR_Z], z[i])
+
+
+class TestALUPythonCompiler(TestALUCompiler):
+    def compile(self, src):
+        return ALUCompiler().compile_to_python(src)
+
+    def test_generates_single_python_function(self):
+        program = self.compile(["inp w", "add w 3", "inp x", "mul x w"])
+        self.assertIn("def alu_program(args, w=0, x=0, y=0, z=0):", program.source)
+        self.assertIn("w = args[0]", program.source)
+        self.assertIn("x = args[1]", program.source)
+        self.assertEqual((5, 10, 0, 0), program.run(2, 2))
+
+    def test_dbg_is_ignored(self):
+        program = self.compile(["dbg 1", "inp w", "dbg 0"])
+        self.assertEqual((3, 0, 0, 0), program.run(3))
+
+    def test_serial_checksum_matches_closure_program(self):
+        with open("serial_checksum.alu", "r") as f:
+            src = list(f)
+        slow = ALUCompiler().compile(src)
+        fast = self.compile(src)
+        for serial in ["11841231127199", "12996997819389", "13579246899999"]:
+            digits = list(map(int, serial))
+            with self.subTest(serial=serial):
+                self.assertEqual(slow.run(*digits), fast.run(*digits))
+
+
+class TestALUOptimizedCompiler(TestALUCompiler):
+    def compile(self, src):
+        return ALUCompiler(optimize=True).compile(src)
+
+
+class TestALUOptimizer(unittest.TestCase):
+    def optimize(self, src):
+        optimizer = ALUOptimizer()
+        instructions = optimizer.optimize(ALUCompiler().parse(src))
+        return [line for line, *_ in instructions], optimizer.eliminated
+
+    def test_drops_no_op_instructions(self):
+        result, eliminated = self.optimize([
+            "inp w",
+            "add w 0",
+            "mul w 1",
+            "div w 1",
+        ])
+        self.assertEqual(["inp w"], result)
+        self.assertEqual(3, eliminated)
+
+    def test_folds_constants(self):
+        result, eliminated = self.optimize([
+            "add x 6",
+            "mul x 7",
+            "mod x 5",
+            "add y x",
+        ])
+        self.assertEqual(["add x 2", "add y 2"], result)
+        self.assertEqual(2, eliminated)
+
+    def test_substitutes_known_registers(self):
+        result, _ = self.optimize([
+            "inp w",
+            "add x 3",
+            "add w x",
+        ])
+        self.assertEqual(["inp w", "add w 3", "add x 3"], result)
+
+    def test_removes_overwritten_writes(self):
+        result, eliminated = self.optimize([
+            "inp w",
+            "inp x",
+            "add y w",
+            "mul y x",
+            "inp y",
+        ])
+        self.assertEqual(["inp w", "inp x", "inp y"], result)
+        self.assertEqual(2, eliminated)
+
+    def test_keeps_division_by_register(self):
+        result, _ = self.optimize([
+            "inp w",
+            "inp x",
+            "div w x",
+            "inp w",
+        ])
+        self.assertEqual(["inp w", "inp x", "div w x", "inp w"], result)
+
+    def test_keeps_division_by_zero(self):
+        for src in (
+            ["inp w", "div w 0", "inp w"],
+            ["inp w", "mod w 0", "inp w"],
+            ["inp w", "div w x", "inp w"],
+            ["inp w", "mul x 0", "mod w x", "inp w"],
+        ):
+            with self.subTest(src=src):
+                result, _ = self.optimize(src)
+                self.assertIn(src[-2].replace(" x", " 0"), result)
+                self.assertEqual(3, len(result))
+
+    def test_materializes_registers_before_dbg(self):
+        result, _ = self.optimize(["add x 4", "dbg 1", "add x 1"])
+        self.assertEqual(["add x 4", "dbg 1", "add x 1"], result)
+
+    def test_optimized_serial_checksum_gives_same_results(self):
+        with open("serial_checksum.alu", "r") as f:
+            src = list(f)
+        compiler = ALUCompiler(optimize=True)
+        optimized = compiler.compile_to_python(src)
+        self.assertGreater(compiler.eliminated, 0)
+        original = ALUCompiler().compile_to_python(src)
+        for serial in ["11841231117189", "12996997819389", "13579246899999"]:
+            digits = list(map(int, serial))
+            with self.subTest(serial=serial):
+                self.assertEqual(original.run(*digits), optimized.run(*digits))
+
+
+class TestALUCompilerCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def compile(self, src, optimize=True):
+        compiler = ALUCompiler(optimize=optimize, cache_dir=self.tmp.name)
+        return compiler, compiler.compile_to_python(src)
+
+    def test_second_compile_uses_cache(self):
+        src = ["inp w", "add x 3", "div w 1", "add w x"]
+        compiler, program = self.compile(src)
+        self.assertFalse(compiler.cache_hit)
+        compiler, cached_program = self.compile(src)
+        self.assertTrue(compiler.cache_hit)
+        self.assertEqual(1, compiler.eliminated)
+        self.assertEqual(program.run(4), cached_program.run(4))
+
+    def test_changed_source_invalidates_cache(self):
+        self.compile(["inp w", "add w 3"])
+        compiler, program = self.compile(["inp w", "add w 4"])
+        self.assertFalse(compiler.cache_hit)
+        self.assertEqual((5, 0, 0, 0), program.run(1))
+
+    def test_optimize_flag_is_part_of_cache_key(self):
+        self.compile(["inp w", "div w 1"], optimize=True)
+        compiler, _ = self.compile(["inp w", "div w 1"], optimize=False)
+        self.assertFalse(compiler.cache_hit)
+
+    def test_corrupt_cache_entry_is_ignored(self):
+        self.compile(["inp w", "add w 3"])
+        for name in os.listdir(self.tmp.name):
+            with open(os.path.join(self.tmp.name, name), "w") as f:
+                f.write("{garbage")
+        compiler, program = self.compile(["inp w", "add w 3"])
+        self.assertFalse(compiler.cache_hit)
+        self.assertEqual((4, 0, 0, 0), program.run(1))
+
+
+def make_monad_block(div_z, add_x, add_y):
+    return [
+        "inp w", "mul x 0", "add x z", "mod x 26", f"div z {div_z}",
+        f"add x {add_x}", "eql x w", "eql x 0", "mul y 0", "add y 25",
+        "mul y x", "add y 1", "mul z y", "mul y 0", "add y w",
+        f"add y {add_y}", "mul y x", "add z y",
+    ]
+
+
+class TestALUAnalyzer(unittest.TestCase):
+
+    def load_serial_checksum(self):
+        with open("serial_checksum.alu", "r") as f:
+            return list(f)
+
+    def test_derives_constraints_for_serial_checksum(self):
+        constraints = ALUAnalyzer().analyze(self.load_serial_checksum())
+        self.assertEqual([
+            (0, 13, 8),
+            (1, 12, 7),
+            (2, 9, -7),
+            (3, 4, -3),
+            (5, 8, -1),
+            (6, 7, -2),
+            (10, 11, -6),
+        ], constraints)
+
+    def test_generated_serials_are_valid(self):
+        src = self.load_serial_checksum()
+        constraints = ALUAnalyzer().analyze(src)
+        serials = list(generate_serials(constraints))
+        self.assertEqual(4032, len(serials))
+        self.assertEqual(sorted(serials), serials)
+        _, _, _, z = ALUCompiler().compile_to_python(src).run_batch(serials)
+        self.assertFalse(z.any())
+
+    def test_find_min_max_serials(self):
+        constraints = ALUAnalyzer().analyze(self.load_serial_checksum())
+        smallest, largest = find_min_max_serials(constraints)
+        self.assertEqual("11841231117189", "".join(map(str, smallest)))
+        self.assertEqual("12996997829399", "".join(map(str, largest)))
+
+    def test_exception_when_block_does_not_match_pattern(self):
+        src = self.load_serial_checksum()
+        src[5] = "add x w"
+        with self.assertRaises(ALUAnalysisError) as context:
+            ALUAnalyzer().analyze(src)
+        self.assertIn("Unexpected instruction for digit 1", str(context.exception))
+
+    def test_exception_when_stack_is_unbalanced(self):
+        src = []
+        for _ in range(14):
+            src += make_monad_block(1, 12, 4)
+        with self.assertRaises(ALUAnalysisError) as context:
+            ALUAnalyzer().analyze(src)
+        self.assertIn("Not all pushed digits are popped", str(context.exception))
+
+    def test_exception_when_wrong_number_of_blocks(self):
+        with self.assertRaises(ALUAnalysisError) as context:
+            ALUAnalyzer().analyze(make_monad_block(1, 12, 4))
+        self.assertIn("Expected 14 digit blocks", str(context.exception))
+
+
+class TestALUSolver(unittest.TestCase):
+    def make_program(self, blocks):
+        src = []
+        for div_z, add_x, add_y in blocks:
+            src += make_monad_block(div_z, add_x, add_y)
+        return src
+
+    def brute_force(self, src, length):
+        program = ALUCompiler().compile_to_python(src)
+        valid = [
+            int("".join(map(str, digits)))
+            for digits in product(range(1, 10), repeat=length)
+            if program.run(*digits)[VAR_Z] == 0
+        ]
+        return min(valid, default=None), max(valid, default=None)
+
+    def test_finds_same_serials_as_brute_force(self):
+        src = self.make_program([(1, 12, 4), (1, 11, 2), (26, -5, 0), (26, -8, 0)])
+        expected = self.brute_force(src, 4)
+        for prune in (True, False):
+            with self.subTest(prune=prune):
+                self.assertEqual(expected, ALUSolver(prune=prune).solve(src))
+
+    def test_returns_none_when_no_serial_is_valid(self):
+        src = self.make_program([(1, 12, 4), (26, 12, 0)])
+        self.assertEqual((None, None), ALUSolver().solve(src))
+
+    def test_only_z_is_live_between_monad_blocks(self):
+        src = self.make_program([(1, 12, 4), (1, 11, 2), (26, -5, 0), (26, -8, 0)])
+        solver = ALUSolver()
+        blocks = solver.split_blocks(ALUCompiler().parse(src))
+        live_registers = solver.find_live_registers(blocks)
+        self.assertEqual([{VAR_Z}] * 5, live_registers)
+
+    def test_reports_stats(self):
+        src = self.make_program([(1, 12, 4), (26, -5, 0)])
+        solver = ALUSolver()
+        self.assertEqual((21, 98), solver.solve(src))
+        self.assertEqual([1, 2], [block for block, _, _ in solver.stats])
+        self.assertEqual(9, solver.peak_states)
+
+
 unittest.main()